@@ -5,6 +5,8 @@ Reference: Pydantic v2 settings management for application configuration
 """
 
 import os
+import secrets
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Any, TYPE_CHECKING
 from pydantic import BaseModel, Field
@@ -22,6 +24,15 @@ except ImportError:
         BaseSettings = object  # type: ignore
         SettingsConfigDict = dict  # type: ignore
 
+# Algorithms PyJWT can sign/verify (asymmetric ones need the cryptography extra)
+_VALID_JWT_ALGORITHMS = frozenset({
+    'HS256', 'HS384', 'HS512',
+    'RS256', 'RS384', 'RS512',
+    'ES256', 'ES384', 'ES512',
+    'PS256', 'PS384', 'PS512',
+    'EdDSA',
+})
+
 
 class FilterRule(BaseModel):
     """Advanced filter rule with validation."""
@@ -63,12 +74,36 @@ class ActionRule(BaseModel):
         return v
 
 
-class AuthConfig(BaseModel):
-    """Authentication configuration."""
-    enabled: bool = Field(False, description="Enable authentication")
-    secret_key: str = Field(..., description="JWT secret key")
-    algorithm: str = Field("HS256", description="JWT algorithm")
-    access_token_expire_minutes: int = Field(30, description="Token expiration time")
+@dataclass(frozen=True)
+class AuthConfig:
+    """
+    Authentication configuration.
+
+    Plain frozen dataclass rather than a pydantic model so the auth/JWT
+    settings can be read straight from the environment via from_env()
+    without constructing AdvancedConfig. Pydantic still validates it when
+    it is nested inside AdvancedConfig.
+    """
+    enabled: bool = False  # Enable authentication
+    secret_key: str = ""  # JWT secret key
+    algorithm: str = "HS256"  # JWT algorithm
+    access_token_expire_minutes: int = 30  # Token expiration time
+
+    def __post_init__(self):
+        if self.algorithm not in _VALID_JWT_ALGORITHMS:
+            raise ValueError(f"JWT algorithm must be one of {sorted(_VALID_JWT_ALGORITHMS)}")
+        if self.access_token_expire_minutes <= 0:
+            raise ValueError("Token expiration time must be positive")
+
+    @classmethod
+    def from_env(cls, prefix: str = 'AIFO_AUTH__') -> "AuthConfig":
+        """Build auth settings from environment variables (same names AdvancedConfig uses)."""
+        return cls(
+            enabled=os.getenv(f'{prefix}ENABLED', 'false').strip().lower() in ('1', 'true', 'yes', 'on'),
+            secret_key=os.getenv(f'{prefix}SECRET_KEY') or secrets.token_urlsafe(32),
+            algorithm=os.getenv(f'{prefix}ALGORITHM', 'HS256'),
+            access_token_expire_minutes=int(os.getenv(f'{prefix}ACCESS_TOKEN_EXPIRE_MINUTES', '30')),
+        )
 
 
 class CacheConfig(BaseModel):
@@ -105,7 +140,7 @@ class AdvancedConfig(BaseSettings):
     tags: List[str] = Field(default_factory=list, description="Available tags")
 
     # Advanced features
-    auth: AuthConfig = Field(default_factory=lambda: AuthConfig(enabled=False, secret_key="", algorithm="HS256", access_token_expire_minutes=30), description="Authentication config")
+    auth: AuthConfig = Field(default_factory=AuthConfig, description="Authentication config")
     cache: CacheConfig = Field(default_factory=lambda: CacheConfig(enabled=True, directory="./cache", size_limit=int(1e9), eviction_policy="least-recently-used"), description="Cache configuration")
     parallel: ParallelConfig = Field(default_factory=lambda: ParallelConfig(enabled=True, max_workers=4, chunk_size=100), description="Parallel processing config")
 
@@ -235,5 +270,26 @@ class AdvancedConfig(BaseSettings):
         return cls(**config_dict)
 
 
-# Global configuration instance
-config = AdvancedConfig()
\ No newline at end of file
+# Global configuration instance (created lazily on first use)
+_advanced_config_instance: Optional[AdvancedConfig] = None
+
+
+def get_advanced_config() -> AdvancedConfig:
+    """Get or create global advanced configuration instance."""
+    global _advanced_config_instance
+    if _advanced_config_instance is None:
+        _advanced_config_instance = AdvancedConfig()
+    return _advanced_config_instance
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Resolve the legacy module-level ``config`` attribute on first access (PEP 562).
+
+    Building AdvancedConfig parses the environment and .env files and creates
+    directories, so it is deferred until something actually needs it instead
+    of running at import time.
+    """
+    if name == 'config':
+        return get_advanced_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,7 +11,7 @@ from click import Context
 
 # Import our modules
 try:
-    from .advanced_config import config
+    from .advanced_config import get_advanced_config
     from .caching import cache_manager
     from .core.duplicates import DuplicateFinder
     from .ui.dashboard import run_dashboard
@@ -25,7 +25,7 @@ except ImportError:
     if str(parent_dir) not in sys.path:
         sys.path.insert(0, str(parent_dir))
 
-    from advanced_config import config
+    from advanced_config import get_advanced_config
     from caching import cache_manager
     from core.duplicates import DuplicateFinder
     from ui.dashboard import run_dashboard
@@ -38,7 +38,7 @@ class AIFileOrganiserCLI:
     """Main CLI class for AI File Organiser."""
 
     def __init__(self):
-        self.config = config
+        self.config = get_advanced_config()
 
     @staticmethod
     def validate_directory(_ctx: Context, _param: Optional[click.Parameter], value: Optional[str]) -> Optional[str]:
@@ -88,7 +88,7 @@ def cli(ctx: Context, config_file: str, verbose: bool, debug: bool, log_level: s
             click.echo(f"Error loading configuration: {e}", err=True)
             sys.exit(1)
     else:
-        ctx.obj['config'] = config
+        ctx.obj['config'] = get_advanced_config()
 
     # Set up logging
     if verbose or debug:
@@ -46,6 +46,8 @@ class Config:
             self.config_path = Path(config_path)
 
         self._config: Dict[str, Any] = {}
+        # Bumped by load() and update() so callers can cache derived values cheaply
+        self._version = 0
         self.load()
 
     def load(self) -> None:
@@ -62,6 +64,7 @@ class Config:
 
         with open(self.config_path, 'r', encoding='utf-8') as f:
             self._config = json.load(f)
+        self._version += 1
 
         # Validate required configuration keys (MEDIUM #1 FIX - Robustness)
         required_keys = ['watched_folders', 'ollama_model', 'base_destination']
@@ -210,6 +213,19 @@ class Config:
         """
         return self.get("base_destination", str(Path.home()))
 
+    @property
+    def multi_process_safe(self) -> bool:
+        """Use cross-process file locks for moves (needed only when several organiser processes share files)."""
+        return self.get("multi_process_safe", False)
+
+    @property
+    def database_pragmas(self) -> Dict[str, Any]:
+        """Per-connection SQLite PRAGMA overrides, e.g. {"synchronous": "FULL", "cache_size": -32768}.
+
+        Keys are limited to those in ConnectionPool.DEFAULT_PRAGMAS. Use config key `database.pragmas`.
+        """
+        return self.get("database.pragmas", {})
+
     @property
     def path_blacklist(self) -> List[str]:
         """List of paths or path prefixes that must not be processed or moved."""
@@ -226,6 +242,11 @@ class Config:
         """
         return self.get("folder_policies", {})
 
+    @property
+    def version(self) -> int:
+        """Change counter, incremented whenever load() or update() modifies the config."""
+        return self._version
+
     def save(self) -> None:
         """
         Save current configuration back to JSON file.
@@ -255,6 +276,7 @@ class Config:
             target = target[k]
 
         target[keys[-1]] = value
+        self._version += 1
 
     def _is_path_blacklisted(self, path: Path, blacklist: List[str]) -> bool:
         """
@@ -19,16 +19,117 @@ License: Proprietary (200-key limited release)
 import yaml
 import os
 import re
+import errno
+import shutil
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Pattern
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Pattern, FrozenSet
+from datetime import date, datetime, timedelta
+from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import CodeType
 import mimetypes
 from fnmatch import fnmatch
- 
 
 
-@dataclass
+@lru_cache(maxsize=512)
+def _guess_mime(suffix: str) -> Optional[str]:
+    """Guess MIME type from a (lowercased) file suffix, memoized per extension."""
+    return mimetypes.guess_type('x' + suffix)[0]
+
+
+@lru_cache(maxsize=128)
+def _compile_script(script: str, filename: str) -> CodeType:
+    """Compile a script action to bytecode, memoized per source string."""
+    return compile(script, filename, 'exec')
+
+
+def _reserve_unique_path(dest_file: Path) -> Path:
+    """
+    Atomically claim a free destination name, adding _1, _2, ... on conflict.
+
+    Each probe is a single O_CREAT|O_EXCL open, which both checks and reserves
+    the name, so concurrent moves can never pick the same target. The caller
+    must replace (or remove) the empty placeholder file left behind.
+    """
+    stem = dest_file.stem
+    suffix = dest_file.suffix
+    candidate = dest_file
+    counter = 0
+    while True:
+        try:
+            fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            counter += 1
+            candidate = dest_file.parent / f"{stem}_{counter}{suffix}"
+            continue
+        os.close(fd)
+        return candidate
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    """
+    Copy file contents entirely in the kernel with copy_file_range (Linux).
+
+    Lets filesystems such as btrfs/XFS use reflinks instead of streaming the
+    data through userspace. Returns False when unavailable or unsupported for
+    this pair of files (or when dst is src itself, which shutil then
+    rejects with SameFileError) so the caller can fall back to shutil. A
+    partly written dst is removed before returning or raising.
+
+    Reference: copy_file_range(2), Linux 4.5+
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    # Opening dst for writing would truncate src when both are the same file
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return False
+
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining <= 0:
+            return True
+    except OSError as e:
+        _unlink_quietly(dst)
+        if e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF):
+            return False
+        raise
+    except BaseException:
+        _unlink_quietly(dst)
+        raise
+    _unlink_quietly(dst)
+    return False
+
+
+def _unlink_quietly(path: Path) -> None:
+    """Remove a partly written copy, ignoring a file that is already gone."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _to_timestamp(value: Any) -> Optional[float]:
+    """Convert a date/datetime filter bound to epoch seconds (local time if naive)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time()).timestamp()
+    return None
+
+
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+
+@dataclass(slots=True)
 class FilterRule:
     """Advanced filter rule with multiple criteria."""
     name: str
@@ -40,13 +141,35 @@ class FilterRule:
     date_created_before: Optional[datetime] = None
     patterns: Optional[List[str]] = None
     regex_patterns: Optional[List[Pattern]] = None
-    mime_types: Optional[List[str]] = None
-    extensions: Optional[List[str]] = None
+    mime_types: Optional[FrozenSet[str]] = None  # Lowercased at parse time
+    extensions: Optional[FrozenSet[str]] = None  # Lowercased at parse time
     exclude_patterns: Optional[List[str]] = None
     exclude_regex: Optional[List[Pattern]] = None
 
+    # Date bounds as epoch seconds, derived in __post_init__ so matches() can
+    # compare stat timestamps directly without building datetime objects
+    _mtime_after_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _mtime_before_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _ctime_after_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _ctime_before_ts: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._mtime_after_ts = _to_timestamp(self.date_modified_after)
+        self._mtime_before_ts = _to_timestamp(self.date_modified_before)
+        self._ctime_after_ts = _to_timestamp(self.date_created_after)
+        self._ctime_before_ts = _to_timestamp(self.date_created_before)
+
     def matches(self, file_path: Path, file_stat: Optional[os.stat_result] = None) -> bool:
         """Check if file matches this filter rule."""
+        # Predicates are ordered cheapest-first so the common rejections
+        # short-circuit before any datetime construction or regex scanning.
+        suffix = file_path.suffix.lower()
+
+        # Extension filtering (set lookup, needs no stat)
+        if self.extensions:
+            if suffix not in self.extensions:
+                return False
+
         if file_stat is None:
             try:
                 file_stat = file_path.stat()
@@ -59,59 +182,56 @@ class FilterRule:
         if self.size_max and file_stat.st_size > self.size_max:
             return False
 
-        # Date filters - Extract modification and creation timestamps
-        # Use st_mtime for modification time (POSIX standard)
-        mtime = datetime.fromtimestamp(file_stat.st_mtime)
-        # Use st_birthtime (macOS/BSD) or fallback to st_ctime (Unix) for creation time
-        # Reference: IEEE Std 1003.1-2008 (POSIX.1-2008) for file timestamps
-        ctime = datetime.fromtimestamp(getattr(file_stat, 'st_birthtime', getattr(file_stat, 'st_ctime', file_stat.st_mtime)))
-
-        if self.date_modified_after and mtime < self.date_modified_after:
-            return False
-        if self.date_modified_before and mtime > self.date_modified_before:
-            return False
-        if self.date_created_after and ctime < self.date_created_after:
-            return False
-        if self.date_created_before and ctime > self.date_created_before:
-            return False
-
-        # Pattern matching
         filename = file_path.name
-        filepath_str = str(file_path)
 
-        # Include patterns
+        # Include/exclude glob patterns
         if self.patterns:
             if not any(fnmatch(filename, p) for p in self.patterns):
                 return False
 
-        if self.regex_patterns:
-            if not any(p.search(filepath_str) for p in self.regex_patterns):
-                return False
-
-        # Exclude patterns
         if self.exclude_patterns:
             if any(fnmatch(filename, p) for p in self.exclude_patterns):
                 return False
 
-        if self.exclude_regex:
-            if any(p.search(filepath_str) for p in self.exclude_regex):
-                return False
-
         # MIME type filtering
         if self.mime_types:
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-            if mime_type not in self.mime_types:
+            if _guess_mime(suffix) not in self.mime_types:
                 return False
 
-        # Extension filtering
-        if self.extensions:
-            if file_path.suffix.lower() not in [ext.lower() for ext in self.extensions]:
+        # Date filters - compare raw stat timestamps against epoch bounds
+        # Use st_mtime for modification time (POSIX standard)
+        if self._mtime_after_ts is not None or self._mtime_before_ts is not None:
+            mtime = file_stat.st_mtime
+            if self._mtime_after_ts is not None and mtime < self._mtime_after_ts:
+                return False
+            if self._mtime_before_ts is not None and mtime > self._mtime_before_ts:
                 return False
 
+        # Use st_birthtime (macOS/BSD) or fallback to st_ctime (Unix) for creation time
+        # Reference: IEEE Std 1003.1-2008 (POSIX.1-2008) for file timestamps
+        if self._ctime_after_ts is not None or self._ctime_before_ts is not None:
+            ctime = getattr(file_stat, 'st_birthtime', getattr(file_stat, 'st_ctime', file_stat.st_mtime))
+            if self._ctime_after_ts is not None and ctime < self._ctime_after_ts:
+                return False
+            if self._ctime_before_ts is not None and ctime > self._ctime_before_ts:
+                return False
+
+        # Regex patterns (most expensive, run last)
+        if self.regex_patterns or self.exclude_regex:
+            filepath_str = str(file_path)
+
+            if self.regex_patterns:
+                if not any(p.search(filepath_str) for p in self.regex_patterns):
+                    return False
+
+            if self.exclude_regex:
+                if any(p.search(filepath_str) for p in self.exclude_regex):
+                    return False
+
         return True
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionRule:
     """Action rule with templating and conflict resolution."""
     name: str
@@ -122,6 +242,17 @@ class ActionRule:
     conflict_resolution: str = 'rename'  # 'rename', 'overwrite', 'skip'
     tags: Optional[List[str]] = None
 
+    # Bytecode for `script`, compiled once instead of on every execution
+    _script_code: Optional[CodeType] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.script:
+            try:
+                self._script_code = _compile_script(self.script, f'<rule:{self.name}>')
+            except SyntaxError:
+                # Reported when the action runs, as before
+                self._script_code = None
+
     def execute(self, file_path: Path, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the action with given context."""
         if self.action == 'script' and self.script:
@@ -146,17 +277,16 @@ class ActionRule:
         dest_file = Path(dest_path)
         dest_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Handle conflicts
-        if dest_file.exists() and self.conflict_resolution == 'rename':
-            counter = 1
-            stem = dest_file.stem
-            suffix = dest_file.suffix
-            while dest_file.exists():
-                dest_file = dest_file.parent / f"{stem}_{counter}{suffix}"
-                counter += 1
-
+        reserved = False
         try:
-            file_path.rename(dest_file)
+            # Handle conflicts
+            if self.conflict_resolution == 'rename':
+                dest_file = _reserve_unique_path(dest_file)
+                reserved = True
+                # Atomically replace the empty placeholder we just created
+                file_path.replace(dest_file)
+            else:
+                file_path.rename(dest_file)
             return {
                 'success': True,
                 'action': 'move',
@@ -164,6 +294,11 @@ class ActionRule:
                 'to': str(dest_file)
             }
         except Exception as e:
+            if reserved:
+                try:
+                    dest_file.unlink()
+                except OSError:
+                    pass
             return {'success': False, 'error': str(e)}
 
     def _execute_copy(self, file_path: Path, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -173,11 +308,16 @@ class ActionRule:
             return {'success': False, 'error': 'No destination specified'}
 
         dest_file = Path(dest_path)
+        # Like shutil.copy2, a directory destination gets a file of the same name
+        if dest_file.is_dir():
+            dest_file = dest_file / file_path.name
         dest_file.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            import shutil
-            shutil.copy2(file_path, dest_file)
+            if _copy_file_range(file_path, dest_file):
+                shutil.copystat(file_path, dest_file)
+            else:
+                shutil.copy2(file_path, dest_file)
             return {
                 'success': True,
                 'action': 'copy',
@@ -236,7 +376,8 @@ class ActionRule:
             }
 
             # Execute script (in controlled environment)
-            exec(self.script, {'__builtins__': {}}, script_context)
+            code = self._script_code or _compile_script(self.script, f'<rule:{self.name}>')
+            exec(code, {'__builtins__': {}}, script_context)
 
             return {
                 'success': True,
@@ -251,14 +392,77 @@ class ActionRule:
         if not template:
             return None
 
-        result = template
-        for key, value in context.items():
-            placeholder = f"{{{key}}}"
-            if isinstance(value, datetime):
-                value = value.strftime("%Y%m%d_%H%M%S")
-            result = result.replace(placeholder, str(value))
+        ctx = {
+            key: (value.strftime("%Y%m%d_%H%M%S") if isinstance(value, datetime) else value)
+            for key, value in context.items()
+        }
+
+        def substitute(match: re.Match) -> str:
+            key = match.group(1)
+            # Unknown placeholders are left as-is, like the old replace() loop
+            return str(ctx[key]) if key in ctx else match.group(0)
+
+        # Single left-to-right pass instead of one replace() per context key
+        return _PLACEHOLDER_RE.sub(substitute, template)
+
 
+# Configs larger than this are parsed as an event stream (see _load_yaml_sections)
+_STREAM_PARSE_THRESHOLD = 256 * 1024
+_STREAMED_SECTIONS = frozenset({'settings', 'filters', 'actions', 'rules'})
+
+_COLLECTION_START_EVENTS = (yaml.MappingStartEvent, yaml.SequenceStartEvent)
+_COLLECTION_END_EVENTS = (yaml.MappingEndEvent, yaml.SequenceEndEvent)
+
+
+def _skip_yaml_node(loader: yaml.SafeLoader) -> None:
+    """Consume the events of the next node without composing or constructing it."""
+    event = loader.get_event()
+    depth = 1 if isinstance(event, _COLLECTION_START_EVENTS) else 0
+    while depth:
+        event = loader.get_event()
+        if isinstance(event, _COLLECTION_START_EVENTS):
+            depth += 1
+        elif isinstance(event, _COLLECTION_END_EVENTS):
+            depth -= 1
+
+
+def _load_yaml_sections(stream, sections: FrozenSet[str]) -> Dict[str, Any]:
+    """
+    Load only the given top-level keys of a YAML mapping document.
+
+    Walks the parser's event stream and builds nodes/objects just for the
+    wanted sections; every other top-level subtree is skipped at the event
+    level, so no node graph or Python objects are allocated for it. Falls
+    back to a full safe_load if the document is not a plain mapping or the
+    partial parse fails (e.g. an alias into a skipped section).
+    """
+    start = stream.tell()
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event()  # StreamStart
+        if loader.check_event(yaml.StreamEndEvent):
+            return {}
+        loader.get_event()  # DocumentStart
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise yaml.YAMLError("Top-level YAML node is not a mapping")
+        loader.get_event()
+
+        result: Dict[str, Any] = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key_event = loader.peek_event()
+            if isinstance(key_event, yaml.ScalarEvent) and key_event.value in sections:
+                loader.get_event()
+                node = loader.compose_node(None, None)
+                result[key_event.value] = loader.construct_document(node)
+            else:
+                _skip_yaml_node(loader)  # key
+                _skip_yaml_node(loader)  # value
         return result
+    except yaml.YAMLError:
+        stream.seek(start)
+        return yaml.safe_load(stream) or {}
+    finally:
+        loader.dispose()
 
 
 class YAMLConfig:
@@ -282,6 +486,8 @@ class YAMLConfig:
         self._rules: List[Dict[str, Any]] = []
         self._filters: Dict[str, FilterRule] = {}
         self._actions: Dict[str, ActionRule] = {}
+        self._base_destination_cached: str = str(Path.home())
+        self._partial_load = False
 
         self.load()
 
@@ -293,15 +499,26 @@ class YAMLConfig:
 
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+                if os.fstat(f.fileno()).st_size > _STREAM_PARSE_THRESHOLD:
+                    # Large config: only materialize the sections we use
+                    self._config = _load_yaml_sections(f, _STREAMED_SECTIONS)
+                    self._partial_load = True
+                else:
+                    self._config = yaml.safe_load(f) or {}
+                    self._partial_load = False
 
             self._parse_rules()
             self._parse_filters()
             self._parse_actions()
+            self._refresh_cached_settings()
 
         except Exception as e:
             raise ValueError(f"Failed to load YAML config: {e}")
 
+    def _refresh_cached_settings(self) -> None:
+        """Cache settings that are read for every file during rule execution."""
+        self._base_destination_cached = self.get('settings.base_destination', str(Path.home()))
+
     def _create_default_config(self) -> None:
         """Create default YAML configuration."""
         default_config = {
@@ -382,16 +599,37 @@ class YAMLConfig:
                         parsed_config[key] = datetime.now() - timedelta(days=days)
                     else:
                         parsed_config[key] = None
+            elif key in ['extensions', 'mime_types'] and value:
+                # Normalize once here so matches() is a single set lookup
+                if isinstance(value, str):
+                    value = [value]
+                parsed_config[key] = frozenset(str(v).lower() for v in value)
             elif key in ['regex_patterns', 'exclude_regex']:
-                if isinstance(value, list):
-                    parsed_config[key] = [re.compile(p) for p in value]
-                else:
-                    parsed_config[key] = [re.compile(str(value))]
+                parsed_config[key] = self._compile_regex_list(value if isinstance(value, list) else [value])
             else:
                 parsed_config[key] = value
 
         return FilterRule(name=name, **parsed_config)
 
+    @staticmethod
+    def _compile_regex_list(patterns: List[Any]) -> List[Pattern]:
+        """
+        Compile regex patterns into a single alternation so matching is one scan.
+
+        Patterns are only merged when none of them has a capturing group:
+        joining them renumbers groups, which breaks backreferences such as
+        ``(a)\\1`` and clashes on duplicate named groups. Falls back to the
+        individual patterns if the combined expression is invalid (e.g.
+        inline global flags).
+        """
+        compiled = [re.compile(str(p)) for p in patterns]
+        if len(compiled) > 1 and all(c.groups == 0 for c in compiled):
+            try:
+                return [re.compile('|'.join(f'(?:{c.pattern})' for c in compiled))]
+            except re.error:
+                pass
+        return compiled
+
     def _parse_actions(self) -> None:
         """Parse action definitions from config."""
         actions_config = self._config.get('actions', {})
@@ -407,13 +645,20 @@ class YAMLConfig:
         """Get rules that match the given file and optional tags."""
         matching_rules = []
 
+        # Each filter is evaluated at most once per file, however many rules use it
+        filter_cache: Dict[str, bool] = {}
+        try:
+            file_stat: Optional[os.stat_result] = file_path.stat()
+        except OSError:
+            file_stat = None
+
         for rule in self._rules:
             # Check tags if specified
             if tags and not self._rule_matches_tags(rule, tags):
                 continue
 
             # Check filters
-            if self._rule_matches_file(rule, file_path):
+            if self._rule_matches_file(rule, file_path, filter_cache, file_stat):
                 matching_rules.append(rule)
 
         return matching_rules
@@ -423,7 +668,9 @@ class YAMLConfig:
         rule_tags = rule.get('tags', [])
         return any(tag in rule_tags for tag in tags)
 
-    def _rule_matches_file(self, rule: Dict[str, Any], file_path: Path) -> bool:
+    def _rule_matches_file(self, rule: Dict[str, Any], file_path: Path,
+                           filter_cache: Optional[Dict[str, bool]] = None,
+                           file_stat: Optional[os.stat_result] = None) -> bool:
         """Check if rule's filters match the file."""
         filter_names = rule.get('filters', [])
 
@@ -431,13 +678,17 @@ class YAMLConfig:
         if not filter_names:
             return True
 
+        if filter_cache is None:
+            filter_cache = {}
+
         # All specified filters must match
         for filter_name in filter_names:
             if filter_name not in self._filters:
                 continue
 
-            filter_rule = self._filters[filter_name]
-            if not filter_rule.matches(file_path):
+            if filter_name not in filter_cache:
+                filter_cache[filter_name] = self._filters[filter_name].matches(file_path, file_stat)
+            if not filter_cache[filter_name]:
                 return False
 
         return True
@@ -459,6 +710,49 @@ class YAMLConfig:
 
         return results
 
+    def execute_rules_batch(self, files: List[Path], tags: Optional[List[str]] = None,
+                            dry_run: bool = True) -> List[List[Dict[str, Any]]]:
+        """
+        Execute matching rules for many files concurrently.
+
+        Stat calls and renames are I/O-bound and release the GIL, so files are
+        processed on a thread pool sized by ``settings.max_workers``. Each file
+        is handled independently (including its conflict renaming), so the
+        files in a batch should be distinct.
+
+        Args:
+            files: Files to process
+            tags: Optional list of tags to restrict rules
+            dry_run: If True, simulate execution
+
+        Returns:
+            List of per-file results, in the same order as ``files``
+        """
+        if not files:
+            return []
+
+        max_workers = max(1, int(self.get('settings.max_workers', 4) or 1))
+        results: List[List[Dict[str, Any]]] = [[] for _ in files]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+            futures = {
+                executor.submit(self.execute_rules, Path(file_path), tags, dry_run): index
+                for index, file_path in enumerate(files)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = [{
+                        'rule': None,
+                        'success': False,
+                        'actions': [],
+                        'errors': [str(e)]
+                    }]
+
+        return results
+
     def _execute_rule(self, rule: Dict[str, Any], file_path: Path, dry_run: bool) -> Dict[str, Any]:
         """Execute a single rule."""
         actions = rule.get('actions', [])
@@ -496,6 +790,7 @@ class YAMLConfig:
     def _build_context(self, file_path: Path) -> Dict[str, Any]:
         """Build context dictionary for template resolution."""
         stat = file_path.stat()
+        now = datetime.now()
 
         return {
             'file_name': file_path.name,
@@ -504,10 +799,10 @@ class YAMLConfig:
             'file_size': stat.st_size,
             'file_mtime': datetime.fromtimestamp(stat.st_mtime),
             'file_ctime': datetime.fromtimestamp(getattr(stat, 'st_birthtime', getattr(stat, 'st_ctime', stat.st_mtime))),
-            'base_destination': self.get('settings.base_destination', str(Path.home())),
-            'year': datetime.now().year,
-            'month': datetime.now().month,
-            'day': datetime.now().day
+            'base_destination': self._base_destination_cached,
+            'year': now.year,
+            'month': now.month,
+            'day': now.day
         }
 
     def execute_rules_by_tags(self, file_path: Path, tags: List[str],
@@ -566,7 +861,7 @@ class YAMLConfig:
             exec_globals.update(context)
 
             # Execute the script
-            exec(script, exec_globals)
+            exec(_compile_script(script, '<script_action>'), exec_globals)
 
             return {
                 'success': True,
@@ -598,8 +893,21 @@ class YAMLConfig:
 
     def save(self) -> None:
         """Save configuration to YAML file."""
+        data = self._config
+        if self._partial_load and self.config_path.exists():
+            # Sections skipped by the streaming loader must survive a save
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                full_config = yaml.safe_load(f) or {}
+            full_config.update(self._config)
+            data = full_config
+
         with open(self.config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(self._config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+
+        self._config = data
+        self._partial_load = False
+
+        self._refresh_cached_settings()
 
     def add_rule(self, rule: Dict[str, Any]) -> None:
         """Add a new organization rule."""
@@ -1,6 +1,6 @@
 """Core modules for file organization."""
 
-from .db_manager import DatabaseManager
+from .db_manager import DatabaseManager, LogAction
 from .classifier import FileClassifier, classify_file
 from .watcher import FolderWatcher, create_watcher
 from .actions import ActionManager
@@ -8,6 +8,7 @@ from .duplicates import DuplicateFinder, find_duplicates
 
 __all__ = [
     'DatabaseManager',
+    'LogAction',
     'FileClassifier',
     'classify_file',
     'FolderWatcher',
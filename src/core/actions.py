@@ -18,26 +18,34 @@ License: Proprietary (200-key limited release)
 """
 
 import os
+import re
+import errno
 import shutil
+import time
 import logging
 import asyncio
+import threading
+import weakref
+import functools
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Deque, NamedTuple, Callable
+from urllib.parse import unquote
 import json
 
-# Import new libraries
-from filelock import FileLock
-import fs
+# filelock, fs and organize are imported lazily where they are used
 try:
-    from organize import organize
-    ORGANIZE_AVAILABLE = True
-except (ImportError, SyntaxError):
-    ORGANIZE_AVAILABLE = False
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Import Safety Guardian for final safety checks
 from .safety_guardian import SafetyGuardian
+from .db_manager import LogAction
 from src.utils.logger import get_logger
 from src.utils.error_handler import (
     FileOperationError, ClassificationError, DatabaseError,
@@ -47,6 +55,245 @@ from src.utils.error_handler import (
 # Initialize logger for audit trail (MEDIUM #2 FIX)
 logger = logging.getLogger(__name__)
 
+# Control characters other than \t, \n and \r (includes null bytes)
+_CTRL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Path traversal ("..", which also covers "/..", "\\.." and "..."), null bytes,
+# Windows reserved characters and control characters
+_DANGEROUS_RE = re.compile(r'\.\.|\x00|[<>:"|?*\n\r\t]')
+
+_IS_WINDOWS = os.name == 'nt'
+
+# Reserved device names that cannot be used as filenames on Windows
+_DANGEROUS_WIN_NAMES = frozenset({
+    'CON', 'PRN', 'AUX', 'NUL',
+    *(f'COM{i}' for i in range(1, 10)),
+    *(f'LPT{i}' for i in range(1, 10)),
+})
+
+# Windows ERROR_SHARING_VIOLATION / ERROR_LOCK_VIOLATION
+_WIN_IN_USE_ERRORS = (32, 33)
+
+
+def _is_file_in_use_error(error: OSError) -> bool:
+    """Check whether an OSError means the file is locked or in use by another process."""
+    if isinstance(error, PermissionError) or error.errno in (errno.EACCES, errno.EBUSY):
+        return True
+    return getattr(error, 'winerror', None) in _WIN_IN_USE_ERRORS
+
+
+class UndoEntry(NamedTuple):
+    """One entry of ActionManager.undo_history."""
+    action: str
+    old_path: str
+    new_path: str
+    timestamp: float  # time.time(); see ActionManager.format_timestamp
+
+
+def _reserve_unique_path(dest_file: Path) -> Path:
+    """
+    Atomically claim a free destination name, adding _1, _2, ... on conflict.
+
+    Each probe is a single O_CREAT|O_EXCL open that both checks and reserves
+    the name, so two moves can never pick the same target. The caller must
+    replace (or remove) the empty placeholder file left behind.
+    """
+    stem = dest_file.stem
+    suffix = dest_file.suffix
+    candidate = dest_file
+    counter = 0
+    while True:
+        try:
+            fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            counter += 1
+            candidate = dest_file.parent / f"{stem}_{counter}{suffix}"
+            continue
+        os.close(fd)
+        return candidate
+
+
+def _list_names(directory: Path) -> Optional[set]:
+    """
+    Names in directory, normcased (case-insensitive on Windows).
+
+    A missing directory yields an empty set; None means it could not be read.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return {os.path.normcase(entry.name) for entry in it}
+    except FileNotFoundError:
+        return set()
+    except OSError:
+        return None
+
+
+def _stat_or_error(path: str):
+    """os.stat(path), or the OSError it raised (for prefetching in a pool)."""
+    try:
+        return os.stat(path)
+    except OSError as e:
+        return e
+
+
+def _find_nonconflicting(directory: Path, stem: str, suffix: str,
+                         exists: Callable[[Path], bool] = os.path.lexists,
+                         taken: Optional[set] = None) -> Path:
+    """
+    Return directory/stem+suffix, or the first free stem_N+suffix if taken.
+
+    Candidates are checked against one listing of the directory (taken, or a
+    fresh os.scandir), instead of one exists() stat per candidate. If the
+    listing fails, exponential probing followed by a binary search keeps the
+    number of exists() calls logarithmic in the number of existing copies.
+    The default exists is os.path.lexists, since any entry (even a dangling
+    symlink) makes a name unavailable.
+    """
+    name = f"{stem}{suffix}"
+    if taken is None:
+        taken = _list_names(directory)
+
+    if taken is not None:
+        if os.path.normcase(name) not in taken:
+            return directory / name
+        counter = 1
+        while os.path.normcase(f"{stem}_{counter}{suffix}") in taken:
+            counter += 1
+        return directory / f"{stem}_{counter}{suffix}"
+
+    if not exists(directory / name):
+        return directory / name
+
+    def candidate(n: int) -> Path:
+        return directory / f"{stem}_{n}{suffix}"
+
+    # Double until a free number is found, then bisect (low taken, high free)
+    high = 1
+    while exists(candidate(high)):
+        high *= 2
+    low = high // 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if exists(candidate(mid)):
+            low = mid
+        else:
+            high = mid
+    return candidate(high)
+
+
+@contextmanager
+def _lock_source(source: str, timeout: float = 10.0):
+    """
+    Hold an exclusive flock on the source file itself (POSIX only).
+
+    Cross-process alternative to a FileLock sidecar: no extra file is created
+    or deleted, and the lock is released when the descriptor is closed.
+    """
+    fd = os.open(source, os.O_RDONLY)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise FileOperationError(
+                        f'Timed out waiting for lock on {source}',
+                        file_path=source
+                    )
+                time.sleep(0.05)
+        yield
+    finally:
+        os.close(fd)
+
+
+@functools.cache
+def _organize_module():
+    """Import the optional organize library on first use (None if unavailable)."""
+    try:
+        from organize import organize
+    except (ImportError, SyntaxError):
+        return None
+    return organize
+
+
+def __getattr__(name: str):
+    """Compute ORGANIZE_AVAILABLE on first access instead of at import time."""
+    if name == 'ORGANIZE_AVAILABLE':
+        return _organize_module() is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Shared "missing source" result for archive_file; callers get a copy
+_ARCHIVE_NOT_FOUND = {
+    'success': False,
+    'action': 'archive',
+    'message': 'File not found'
+}
+
+
+def _make_safe(fn):
+    """Wrap a logging callable so that its failures never break a file operation."""
+    @functools.wraps(fn)
+    def _safe(*args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            pass
+    return _safe
+
+
+# Most action log rows kept for a retry while the database keeps failing
+_LOG_BUFFER_LIMIT = 4096
+
+
+def _flush_log_rows(db_manager, buffer: List[LogAction], lock: threading.Lock) -> bool:
+    """
+    Write and clear buffered action log rows in one database transaction.
+
+    When the write fails the rows go back to the front of the buffer, so the
+    next flush retries them; past _LOG_BUFFER_LIMIT rows the oldest are dropped.
+
+    Returns:
+        bool: False if the rows could not be written
+    """
+    with lock:
+        rows = buffer[:]
+        buffer.clear()
+    if not rows:
+        return True
+    try:
+        db_manager.bulk_log_actions(rows)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write {len(rows)} buffered action log rows: {str(e)}", exc_info=True)
+    with lock:
+        buffer[:0] = rows
+        overflow = len(buffer) - _LOG_BUFFER_LIMIT
+        if overflow > 0:
+            del buffer[:overflow]
+    if overflow > 0:
+        logger.error(f"Action log buffer full, dropped {overflow} oldest rows")
+    return False
+
+
+@dataclass(slots=True)
+class ActionPlan:
+    """A validated file operation, built once by ActionManager._plan_action."""
+    path: Optional[Path]
+    new_path: Optional[Path] = None
+    action_type: Optional[str] = None
+    category: Optional[str] = None
+    method: Optional[str] = None
+    blocked_reason: Optional[str] = None
+    blocked_action: str = 'blocked'
+
+    def block(self, reason: str, action: str = 'blocked') -> None:
+        """Mark the plan as not executable."""
+        self.blocked_reason = reason
+        self.blocked_action = action
+
 
 class ActionManager:
     """
@@ -56,9 +303,22 @@ class ActionManager:
         config: Configuration object
         db_manager: Database manager for logging
         dry_run (bool): If True, simulate actions without actually performing them
-        undo_history (List): Stack of recent actions for undo functionality
+        undo_history (Deque): Bounded stack of recent actions for undo functionality
     """
 
+    # Upper bound on memoized folder policy lookups (one per parent directory)
+    _POLICY_CACHE_SIZE = 1024
+
+    # Upper bound on cached validated destination directories (one per suggested path)
+    _DEST_DIR_CACHE_SIZE = 1024
+
+    # Upper bound on remembered created directories
+    _KNOWN_DIRS_SIZE = 4096
+
+    # Buffered database logging: flush after this many rows or seconds
+    _LOG_FLUSH_ROWS = 64
+    _LOG_FLUSH_INTERVAL = 0.5
+
     def __init__(self, config, db_manager, dry_run: Optional[bool] = None, ollama_client=None):
         """
         Initialize action manager.
@@ -72,15 +332,115 @@ class ActionManager:
         self.config = config
         self.db_manager = db_manager
         self.dry_run = dry_run if dry_run is not None else config.dry_run
-        self.undo_history: List[Dict[str, Any]] = []
-        self.max_undo_history = 50  # Keep last 50 actions
+        self.undo_history: Deque[UndoEntry] = deque(maxlen=50)  # Keep last 50 actions
 
         # Initialize Safety Guardian for final evaluation
         self.safety_guardian = SafetyGuardian(config, ollama_client)
         self._logger = get_logger()
+        self._safe_log = _make_safe(self._logger.log_operation)
+
+        # Minutes saved per operation, read once (config.time_estimates re-walks the config on every access)
+        time_estimates = getattr(config, 'time_estimates', None)
+        self._time_saved: Dict[str, float] = {'archive': 0.4, 'delete': 0.2}
+        if isinstance(time_estimates, dict):
+            self._time_saved.update(time_estimates)
+
+        # Async processing support (sized by performance.max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self._executor_workers(config),
+                                           thread_name_prefix="ActionExecutor")
+
+        # Process-local per-path locks: {path: [lock, users]}. Cross-process
+        # FileLock sidecars are only used when config.multi_process_safe is set.
+        self._path_locks: Dict[str, List[Any]] = {}
+        self._locks_guard = threading.Lock()
+
+        # Resolved path_blacklist, rebuilt by _resolved_blacklist() when the raw list changes
+        self._blacklist_source: tuple = ()
+        self._blacklist_resolved: List[Tuple[str, str]] = []
+        self._resolved_blacklist()
+
+        # Resolved base_destination and per-directory folder policies
+        self._base_dir: Optional[Path] = None
+        self._base_dir_source: Any = None
+        self._policy_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        # Validated destination directories: {suggested_path: (dest_dir, error)}
+        self._dest_dir_cache: Dict[str, Tuple[Optional[Path], Optional[str]]] = {}
+
+        # Destination directories already created by this manager (see _ensure_dir)
+        self._known_dirs: set = set()
+
+        # (source dir, destination dir) pairs known to be on different devices
+        self._cross_device_dirs: set = set()
+
+        # Default archive root and cached (monotonic time, "YYYY/MM") subfolder
+        self._home_archive = Path.home() / "Archive"
+        self._home_archive_str = str(self._home_archive)
+        self._archive_subdir_cache: Tuple[float, str] = (0.0, "")
+
+        # Memoized Path.exists() results and directory listings, only while
+        # inside batch_scope()
+        self._exists_cache: Optional[Dict[str, bool]] = None
+        self._dir_names_cache: Optional[Dict[str, set]] = None
+        self._policy_version: Optional[int] = None
+
+        # Action log rows waiting to be written with one bulk_log_actions call;
+        # whatever is left is flushed when the manager is collected or at exit
+        self._log_buffer: List[LogAction] = []
+        self._log_lock = threading.Lock()
+        self._log_timer: Optional[threading.Timer] = None
+        weakref.finalize(self, _flush_log_rows, db_manager, self._log_buffer, self._log_lock)
+
+    @property
+    def dry_run(self) -> bool:
+        """Whether actions are simulated instead of performed."""
+        return self._dry_run
+
+    @dry_run.setter
+    def dry_run(self, value: bool) -> None:
+        # Pick the action handler once instead of branching for every file
+        self._dry_run = value
+        self._run_action = self._dry_run_action if value else self._perform_action
+
+    @property
+    def max_undo_history(self) -> int:
+        """Maximum number of entries kept in undo_history."""
+        return self.undo_history.maxlen
+
+    @max_undo_history.setter
+    def max_undo_history(self, value: int) -> None:
+        # deque.maxlen is read-only; rebuild, keeping the most recent entries
+        self.undo_history = deque(self.undo_history, maxlen=value)
+
+    @staticmethod
+    def _executor_workers(config) -> int:
+        """Worker count for the async executor, from performance.max_workers (default 4)."""
+        try:
+            return max(1, int(config.get('performance.max_workers', 4)))
+        except (AttributeError, TypeError, ValueError):
+            return 4
 
-        # Async processing support
-        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ActionExecutor")
+    @contextmanager
+    def _acquire_path_lock(self, key: str):
+        """
+        Hold an in-process lock for a source path while it is being moved.
+
+        Entries are reference counted and dropped once no thread uses them,
+        so the table does not grow with every file ever processed.
+        """
+        with self._locks_guard:
+            entry = self._path_locks.get(key)
+            if entry is None:
+                entry = self._path_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._path_locks[key]
 
     def _validate_input_safety(self, file_path: str, classification: Dict[str, Any]) -> tuple:
         """
@@ -101,7 +461,7 @@ class ActionManager:
             return False, "File path too long (potential attack)"
 
         # Check for null bytes or other control characters
-        if '\x00' in file_path or any(ord(c) < 32 for c in file_path if c not in '\n\r\t'):
+        if _CTRL_RE.search(file_path):
             return False, "File path contains control characters (potential attack)"
 
         # Validate classification result
@@ -129,9 +489,7 @@ class ActionManager:
             if len(rename) > 255:  # Reasonable filename length limit
                 return False, "Rename too long (potential attack)"
             # Check for dangerous filename patterns
-            dangerous_names = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4',
-                             'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
-            if os.name == 'nt' and rename.upper() in dangerous_names:
+            if _IS_WINDOWS and rename.upper() in _DANGEROUS_WIN_NAMES:
                 return False, f"Dangerous filename '{rename}' not allowed on Windows"
 
         return True, ""
@@ -154,233 +512,303 @@ class ActionManager:
         logger.info(f"Starting organization of {file_path} (user_approved={user_approved})")
 
         try:
-            # Step 1: Validate inputs and file
-            validation_result = self._validate_execution_inputs(file_path, classification)
-            if not validation_result['valid']:
-                return validation_result['result']
-
-            path = Path(file_path)
-
-            # Step 2: Check policies and security
-            policy_result = self._check_policies_and_security(path, file_path, folder_policy)
-            if not policy_result['allowed']:
-                return policy_result['result']
-
-            # Step 3: Determine action and build paths
-            action_result = self._determine_action(path, classification)
-            if not action_result['determined']:
-                return action_result['result']
-
-            action_type = action_result['action_type']
-            new_path = action_result['new_path']
+            # Steps 1-3: validate inputs, check policies, determine action
+            plan = self._plan_action(file_path, classification, folder_policy)
+            if plan.blocked_reason:
+                return self._blocked_result(file_path, plan)
 
             # Step 4: Safety Guardian check
-            safety_result = self._perform_safety_check(path, new_path, action_type, classification, user_approved)
+            safety_result = self._perform_safety_check(plan, classification, user_approved)
             if not safety_result['approved']:
                 return safety_result['result']
 
             # Step 5: Execute the action
-            execution_result = self._execute_determined_action(path, new_path, action_type, classification, user_approved)
-            return execution_result
+            return self._execute_plan(plan, user_approved)
 
-        except (FileOperationError, SafetyViolationError, ConfigurationError) as e:
-            logger.error(f"Operation failed for {file_path}: {str(e)}", exc_info=True)
-            return {
-                'success': False,
-                'action': 'error',
-                'old_path': file_path,
-                'new_path': None,
-                'time_saved': 0.0,
-                'message': f'{type(e).__name__}: {str(e)}'
-            }
         except Exception as e:
-            logger.error(f"Unexpected error organizing {file_path}: {str(e)}", exc_info=True)
-            return {
-                'success': False,
-                'action': 'error',
-                'old_path': file_path,
-                'new_path': None,
-                'time_saved': 0.0,
-                'message': f'Unexpected error: {str(e)}'
-            }
+            return self._error_result(file_path, e)
+
+    def execute_many(self, items: List[Tuple[str, Dict[str, Any]]],
+                     user_approved: bool = False) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of file organization actions.
+
+        Every item is validated and safety-checked first, then the approved
+        moves are performed back to back and all successful actions are written
+        to the database in a single transaction.
+
+        Args:
+            items (List[Tuple[str, Dict]]): (file_path, classification) pairs
+            user_approved (bool): Whether user explicitly approved these actions
+
+        Returns:
+            List[Dict]: Action results, in the same order as items
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        # Stat every source up front on the executor so slow (network or
+        # cold-cache) metadata lookups overlap instead of running one by one
+        stats = None
+        if len(items) > 1:
+            paths = [file_path for file_path, _ in items]
+            stats = dict(zip(paths, self.executor.map(_stat_or_error, paths)))
+
+        # Phase 1: validate and safety-check every item before touching the disk
+        approved = []
+        for index, (file_path, classification) in enumerate(items):
+            try:
+                plan = self._plan_action(file_path, classification, stats=stats)
+                if plan.blocked_reason:
+                    results[index] = self._blocked_result(file_path, plan)
+                    continue
+                safety_result = self._perform_safety_check(plan, classification, user_approved)
+            except Exception as e:
+                results[index] = self._error_result(file_path, e)
+                continue
+            if safety_result['approved']:
+                approved.append((index, plan))
+            else:
+                results[index] = safety_result['result']
+
+        # Phase 2: perform the approved moves
+        for index, plan in approved:
+            try:
+                result = self._run_action(plan.path, plan.new_path, plan.action_type)
+            except Exception as e:
+                results[index] = self._error_result(str(plan.path), e)
+                continue
+
+            if result['success']:
+                plan.new_path = Path(result['new_path'])
+                row = self._log_row(plan, user_approved)
+                self._record_success(plan, result, row.time_saved)
+                self._queue_log(row, flush=False)
+            else:
+                logger.warning(f"Action failed for {plan.path}: {result.get('message', 'Unknown reason')}")
+            results[index] = result
 
-    def _validate_execution_inputs(self, file_path: str, classification: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate inputs and file for execution."""
+        # Phase 3: one database transaction for the whole batch
+        self.flush_logs()
+
+        return results
+
+    def _plan_action(self, file_path: str, classification: Dict[str, Any],
+                     folder_policy: Optional[Dict[str, Any]] = None,
+                     stats: Optional[Dict[str, Any]] = None) -> ActionPlan:
+        """
+        Validate a request and work out the file operation in a single pass.
+
+        The classification is read once here; the later steps only use the
+        returned plan. A plan with blocked_reason set must not be executed.
+
+        Args:
+            file_path (str): Current file path
+            classification (Dict): Classification result from classifier
+            folder_policy (Dict, optional): Folder policy dict to override config lookup
+            stats (Dict, optional): Prefetched os.stat results (or OSErrors) by path
+
+        Returns:
+            ActionPlan: Prepared (or blocked) operation
+        """
         # Validate inputs for security
         input_safe, input_error = self._validate_input_safety(file_path, classification)
         if not input_safe:
             logger.warning(f"Input validation failed for {file_path}: {input_error}")
-            return {
-                'valid': False,
-                'result': {
-                    'success': False,
-                    'action': 'blocked',
-                    'old_path': file_path,
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': f'Security: {input_error}'
-                }
-            }
+            return ActionPlan(None, blocked_reason=f'Security: {input_error}')
 
-        path = Path(file_path)
+        plan = ActionPlan(Path(file_path),
+                          category=classification.get('category'),
+                          method=classification.get('method'))
 
-        # Validate file exists
-        if not path.exists():
+        # Step 1: Validate the file itself
+        self._validate_execution_inputs(plan, file_path, stats)
+        if plan.blocked_reason:
+            return plan
+
+        # Step 2: Check policies and security
+        self._check_policies_and_security(plan, file_path, folder_policy)
+        if plan.blocked_reason:
+            return plan
+
+        # Step 3: Determine action and build paths
+        self._determine_action(plan, classification.get('suggested_path'), classification.get('rename'))
+        return plan
+
+    @staticmethod
+    def _blocked_result(file_path: str, plan: ActionPlan) -> Dict[str, Any]:
+        """Build the result dict for a plan that was blocked before execution."""
+        return {
+            'success': False,
+            'action': plan.blocked_action,
+            'old_path': file_path,
+            'new_path': None,
+            'time_saved': 0.0,
+            'message': plan.blocked_reason
+        }
+
+    def _error_result(self, file_path: str, error: Exception) -> Dict[str, Any]:
+        """Build the result dict for an operation that raised."""
+        if isinstance(error, (FileOperationError, SafetyViolationError, ConfigurationError)):
+            logger.error(f"Operation failed for {file_path}: {str(error)}", exc_info=True)
+            message = f'{type(error).__name__}: {str(error)}'
+        else:
+            logger.error(f"Unexpected error organizing {file_path}: {str(error)}", exc_info=True)
+            message = f'Unexpected error: {str(error)}'
+        return {
+            'success': False,
+            'action': 'error',
+            'old_path': file_path,
+            'new_path': None,
+            'time_saved': 0.0,
+            'message': message
+        }
+
+    def _validate_execution_inputs(self, plan: ActionPlan, file_path: str,
+                                   stats: Optional[Dict[str, Any]] = None) -> None:
+        """Validate the file for execution, blocking the plan if it is unsuitable."""
+        # Validate file exists (single stat, possibly prefetched; size is read from the same result)
+        try:
+            st = stats.get(file_path) if stats else None
+            if st is None:
+                st = os.stat(file_path)
+            elif isinstance(st, OSError):
+                raise st
+        except (FileNotFoundError, NotADirectoryError):
             logger.warning(f"File not found: {file_path}")
-            return {
-                'valid': False,
-                'result': {
-                    'success': False,
-                    'action': 'none',
-                    'old_path': file_path,
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': 'File not found'
-                }
-            }
+            plan.block('File not found', action='none')
+            return
 
         # Enhanced file validation
-        file_size = path.stat().st_size
+        file_size = st.st_size
         max_file_size = getattr(self.config, 'max_file_size', 100 * 1024 * 1024)
         if file_size > max_file_size:
             logger.warning(f"File too large: {file_path} ({file_size} bytes > {max_file_size} bytes)")
-            return {
-                'valid': False,
-                'result': {
-                    'success': False,
-                    'action': 'blocked',
-                    'old_path': file_path,
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': f'File too large ({file_size} bytes > {max_file_size} bytes)'
-                }
-            }
+            plan.block(f'File too large ({file_size} bytes > {max_file_size} bytes)')
+            return
 
         # Check for suspicious file characteristics
         if file_size == 0:
             logger.warning(f"Empty file blocked: {file_path}")
-            return {
-                'valid': False,
-                'result': {
-                    'success': False,
-                    'action': 'blocked',
-                    'old_path': file_path,
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': 'Empty files not processed'
-                }
-            }
-
-        return {'valid': True}
+            plan.block('Empty files not processed')
 
-    def _check_policies_and_security(self, path: Path, file_path: str, folder_policy: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Check folder policies and security constraints."""
+    def _check_policies_and_security(self, plan: ActionPlan, file_path: str,
+                                     folder_policy: Optional[Dict[str, Any]]) -> None:
+        """Check folder policies and security constraints, blocking the plan on a violation."""
         # Check folder policy allow_move
         if folder_policy is None:
-            folder_policy = self.config.get_folder_policy(file_path)
+            folder_policy = self._folder_policy(file_path)
 
         if folder_policy and folder_policy.get('allow_move') is False:
             logger.info(f"Operation blocked by folder policy: {file_path}")
-            return {
-                'allowed': False,
-                'result': {
-                    'success': False,
-                    'action': 'blocked',
-                    'old_path': file_path,
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': 'Operation blocked: folder policy disallows moves'
-                }
-            }
+            plan.block('Operation blocked: folder policy disallows moves')
+            return
 
-        # Check against configured blacklist paths
+        # Check against configured blacklist paths (resolved once, see _resolved_blacklist).
+        # Both sides are resolved and normcased, so a prefix test is enough.
         try:
-            blacklist = getattr(self.config, 'path_blacklist', []) or []
-            resolved = str(path.resolve())
-            for b in blacklist:
-                try:
-                    b_res = str(Path(b).expanduser().resolve())
-                    if os.path.commonpath([resolved, b_res]) == b_res:
-                        return {
-                            'allowed': False,
-                            'result': {
-                                'success': False,
-                                'action': 'blocked',
-                                'old_path': file_path,
-                                'new_path': None,
-                                'time_saved': 0.0,
-                                'message': f'Operation blocked: path is blacklisted ({b_res})'
-                            }
-                        }
-                except Exception:
-                    if resolved.lower().startswith(str(Path(b).expanduser().resolve()).lower()):
-                        return {
-                            'allowed': False,
-                            'result': {
-                                'success': False,
-                                'action': 'blocked',
-                                'old_path': file_path,
-                                'new_path': None,
-                                'time_saved': 0.0,
-                                'message': f'Operation blocked: path is blacklisted ({b})'
-                            }
-                        }
+            blacklist = self._resolved_blacklist()
+            if blacklist:
+                resolved = os.path.normcase(str(plan.path.resolve()))
+                for b_res, b_prefix in blacklist:
+                    if resolved == b_res or resolved.startswith(b_prefix):
+                        plan.block(f'Operation blocked: path is blacklisted ({b_res})')
+                        return
         except Exception:
             pass
 
-        return {'allowed': True}
+    def _resolved_blacklist(self) -> List[Tuple[str, str]]:
+        """
+        Return config.path_blacklist expanded, resolved and case-normalised,
+        as (path, path + separator) pairs for prefix matching.
 
-    def _determine_action(self, path: Path, classification: Dict[str, Any]) -> Dict[str, Any]:
-        """Determine action type and build destination path."""
-        suggested_path = classification.get('suggested_path')
-        suggested_rename = classification.get('rename')
+        Resolving costs filesystem calls per entry, so the result is cached and
+        only rebuilt when the configured list changes. Unresolvable entries are dropped.
+        """
+        raw = tuple(getattr(self.config, 'path_blacklist', []) or [])
+        if raw != self._blacklist_source:
+            resolved = []
+            for b in raw:
+                try:
+                    b_res = os.path.normcase(str(Path(b).expanduser().resolve()))
+                except (OSError, RuntimeError, TypeError, ValueError):
+                    continue
+                # A root ("/" or "C:\\") already ends with the separator
+                resolved.append((b_res, b_res if b_res.endswith(os.sep) else b_res + os.sep))
+            self._blacklist_source = raw
+            self._blacklist_resolved = resolved
+        return self._blacklist_resolved
+
+    def _base_destination_dir(self) -> Path:
+        """
+        Return config.base_destination expanded and resolved.
+
+        Cached per ActionManager and recomputed only when the configured value
+        changes, instead of resolving the path for every file.
+        """
+        raw = getattr(self.config, 'base_destination', None)
+        if self._base_dir is None or raw != self._base_dir_source:
+            try:
+                self._base_dir = Path(raw).expanduser().resolve()
+            except (TypeError, OSError):
+                self._base_dir = Path.home()  # Fallback only on error
+            self._base_dir_source = raw
+            self._dest_dir_cache.clear()
+        return self._base_dir
+
+    def _folder_policy(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the folder policy for file_path, memoized by parent directory.
+
+        Policies are folder-scoped, so files in the same directory share one
+        config.get_folder_policy() call. The cache is dropped whenever
+        config.version changes (i.e. after Config.load() or Config.update()).
+        """
+        version = getattr(self.config, 'version', None)
+        if not isinstance(version, int):
+            return self.config.get_folder_policy(file_path)
 
+        if version != self._policy_version:
+            self._policy_cache.clear()
+            self._policy_version = version
+
+        parent = os.path.dirname(file_path)
+        try:
+            return self._policy_cache[parent]
+        except KeyError:
+            pass
+
+        policy = self.config.get_folder_policy(file_path)
+        if len(self._policy_cache) >= self._POLICY_CACHE_SIZE:
+            self._policy_cache.clear()
+        self._policy_cache[parent] = policy
+        return policy
+
+    def _determine_action(self, plan: ActionPlan, suggested_path: Optional[str],
+                          suggested_rename: Optional[str]) -> None:
+        """Determine action type and build destination path."""
         # Build new path with path traversal validation
         if suggested_path:
             try:
-                new_path = self._build_destination_path(path, suggested_path, suggested_rename)
-                action_type = 'move'
+                plan.new_path = self._build_destination_path(plan.path, suggested_path, suggested_rename)
+                plan.action_type = 'move'
             except ValueError as e:
-                return {
-                    'determined': False,
-                    'result': {
-                        'success': False,
-                        'action': 'blocked',
-                        'old_path': str(path),
-                        'new_path': None,
-                        'time_saved': 0.0,
-                        'message': f'Security: {str(e)}'
-                    }
-                }
+                plan.block(f'Security: {str(e)}')
         elif suggested_rename:
-            new_path = path.parent / suggested_rename
-            action_type = 'rename'
+            plan.new_path = plan.path.parent / suggested_rename
+            plan.action_type = 'rename'
         else:
-            return {
-                'determined': False,
-                'result': {
-                    'success': False,
-                    'action': 'none',
-                    'old_path': str(path),
-                    'new_path': None,
-                    'time_saved': 0.0,
-                    'message': 'No action suggested'
-                }
-            }
+            plan.block('No action suggested', action='none')
 
-        return {
-            'determined': True,
-            'action_type': action_type,
-            'new_path': new_path
-        }
-
-    def _perform_safety_check(self, path: Path, new_path: Path, action_type: str,
-                             classification: Dict[str, Any], user_approved: bool) -> Dict[str, Any]:
+    def _perform_safety_check(self, plan: ActionPlan, classification: Dict[str, Any],
+                              user_approved: bool) -> Dict[str, Any]:
         """Perform Safety Guardian evaluation."""
+        action_type = plan.action_type
+        src_str = str(plan.path)
+        dst_str = str(plan.new_path) if plan.new_path is not None else None
         logger.info(f"[FINAL SAFETY CHECK] Evaluating operation with Safety Guardian...")
         safety_result = self.safety_guardian.evaluate_operation(
-            source_path=str(path),
-            destination_path=str(new_path),
+            source_path=src_str,
+            destination_path=dst_str,
             operation=action_type,
             classification=classification,
             user_approved=user_approved
@@ -389,23 +817,20 @@ class ActionManager:
         # Check if Safety Guardian approved the operation
         if not safety_result['approved']:
             logger.warning(f"[SAFETY GUARDIAN BLOCKED] Operation rejected: {safety_result['reasoning']}")
-            try:
-                self._logger.log_operation(
-                    operation='SKIP',
-                    file_path=str(path),
-                    old_location=str(path),
-                    new_location=str(new_path),
-                    status='PROTECTED'
-                )
-            except Exception:
-                pass
+            self._safe_log(
+                operation='SKIP',
+                file_path=src_str,
+                old_location=src_str,
+                new_location=dst_str,
+                status='PROTECTED'
+            )
             return {
                 'approved': False,
                 'result': {
                     'success': False,
                     'action': 'blocked_by_guardian',
-                    'old_path': str(path),
-                    'new_path': str(new_path),
+                    'old_path': src_str,
+                    'new_path': dst_str,
                     'time_saved': 0.0,
                     'message': f"Safety Guardian blocked operation: {safety_result['reasoning']}",
                     'safety_result': safety_result
@@ -422,53 +847,90 @@ class ActionManager:
 
     def _execute_determined_action(self, path: Path, new_path: Path, action_type: str,
                                   classification: Dict[str, Any], user_approved: bool) -> Dict[str, Any]:
-        """Execute the determined action and handle logging."""
+        """Execute an already-determined action and handle logging."""
+        plan = ActionPlan(path, new_path, action_type,
+                          classification.get('category'), classification.get('method'))
+        return self._execute_plan(plan, user_approved)
+
+    def _execute_plan(self, plan: ActionPlan, user_approved: bool) -> Dict[str, Any]:
+        """Execute an approved plan and handle logging."""
         # Perform the action
-        if self.dry_run:
-            result = self._dry_run_action(path, new_path, action_type)
-        else:
-            result = self._perform_action(path, new_path, action_type)
+        result = self._run_action(plan.path, plan.new_path, plan.action_type)
 
         # Log action to database and file system
         if result['success']:
-            time_saved = self.config.time_estimates.get(action_type, 0.3)
-            logger.info(f"Successfully {action_type}d: {path} -> {new_path}")
-
-            self.db_manager.log_action(
-                filename=path.name,
-                old_path=str(path),
-                new_path=str(new_path) if new_path else None,
-                operation=action_type,
-                time_saved=time_saved,
-                category=classification.get('category'),
-                ai_suggested=classification.get('method') == 'ai',
-                user_approved=user_approved
-            )
+            plan.new_path = Path(result['new_path'])
+            row = self._log_row(plan, user_approved)
+            self._queue_log(row)
+            self._record_success(plan, result, row.time_saved)
+        else:
+            logger.warning(f"Action failed for {plan.path}: {result.get('message', 'Unknown reason')}")
 
-            try:
-                self._logger.log_operation(
-                    operation=action_type.upper(),
-                    file_path=str(path),
-                    old_location=str(path),
-                    new_location=str(new_path),
-                    status='SUCCESS' if 'dry_run' not in result['action'] else 'DRY_RUN'
-                )
-            except Exception:
-                pass
+        return result
 
-            result['time_saved'] = time_saved
+    def _log_row(self, plan: ActionPlan, user_approved: bool) -> LogAction:
+        """Build the database log entry for a successful action."""
+        return LogAction(
+            filename=plan.path.name,
+            old_path=str(plan.path),
+            new_path=str(plan.new_path) if plan.new_path else None,
+            operation=plan.action_type,
+            time_saved=self._time_saved.get(plan.action_type, 0.3),
+            category=plan.category,
+            ai_suggested=plan.method == 'ai',
+            user_approved=user_approved
+        )
 
-            # Add to undo history
-            self._add_to_undo_history({
-                'action': action_type,
-                'old_path': str(path),
-                'new_path': str(new_path),
-                'timestamp': datetime.now().isoformat()
-            })
-        else:
-            logger.warning(f"Action failed for {path}: {result.get('message', 'Unknown reason')}")
+    def _queue_log(self, row: LogAction, flush: bool = True) -> None:
+        """
+        Buffer a database log row instead of committing it immediately.
 
-        return result
+        The buffer is written once it holds _LOG_FLUSH_ROWS rows or
+        _LOG_FLUSH_INTERVAL seconds after the first buffered row.
+        Pass flush=False to leave flushing to the caller.
+        """
+        with self._log_lock:
+            self._log_buffer.append(row)
+            full = len(self._log_buffer) >= self._LOG_FLUSH_ROWS
+            if flush and not full and self._log_timer is None:
+                self._log_timer = threading.Timer(self._LOG_FLUSH_INTERVAL, self.flush_logs)
+                self._log_timer.daemon = True
+                self._log_timer.start()
+        if flush and full:
+            self.flush_logs()
+
+    def flush_logs(self) -> bool:
+        """
+        Write all buffered action log rows to the database now.
+
+        Returns:
+            bool: False if the write failed; the rows stay buffered for the next flush
+        """
+        with self._log_lock:
+            timer, self._log_timer = self._log_timer, None
+        if timer is not None:
+            timer.cancel()
+        return _flush_log_rows(self.db_manager, self._log_buffer, self._log_lock)
+
+    def _record_success(self, plan: ActionPlan, result: Dict[str, Any], time_saved: float) -> None:
+        """Write the operation log, set time_saved and push the action onto the undo history."""
+        action_type = plan.action_type
+        src_str = str(plan.path)
+        dst_str = str(plan.new_path) if plan.new_path is not None else None
+        logger.info(f"Successfully {action_type}d: {src_str} -> {dst_str}")
+
+        self._safe_log(
+            operation=action_type.upper(),
+            file_path=src_str,
+            old_location=src_str,
+            new_location=dst_str,
+            status='SUCCESS' if 'dry_run' not in result['action'] else 'DRY_RUN'
+        )
+
+        result['time_saved'] = time_saved
+
+        # Add to undo history
+        self._add_to_undo_history(UndoEntry(action_type, src_str, dst_str, time.time()))
 
     async def async_execute_determined_action(self, path: Path, new_path: Path, action_type: str,
                                        classification: Dict[str, Any], user_approved: bool) -> Dict[str, Any]:
@@ -485,7 +947,7 @@ class ActionManager:
         Returns:
             Dict: Action execution result
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(self.executor, self._execute_determined_action, path, new_path, action_type, classification, user_approved)
 
     async def execute_async(self, file_path: str, classification: Dict[str, Any],
@@ -502,10 +964,9 @@ class ActionManager:
         Returns:
             Dict: Action result
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            self.executor,
-            lambda: self.execute(file_path, classification, user_approved, folder_policy)
+            self.executor, self.execute, file_path, classification, user_approved, folder_policy
         )
 
     def _validate_path_safety(self, suggested_path: str, base_dir: Path) -> tuple:
@@ -522,36 +983,26 @@ class ActionManager:
         if not suggested_path:
             return True, ""
 
-        # Enhanced path traversal patterns
-        dangerous_patterns = [
-            "..",  # Parent directory traversal
-            "\\..",  # Windows-style traversal
-            "/..",  # Unix-style traversal
-            "...",  # Triple dot (some systems)
-            "\x00",  # Null byte injection
-            "<", ">", ":", "\"", "|", "?", "*",  # Windows reserved characters
-            "\n", "\r", "\t",  # Control characters
-        ]
-
-        for pattern in dangerous_patterns:
-            if pattern in suggested_path:
-                return False, f"Path contains dangerous pattern '{pattern}' (potential security threat)"
-
-        # Check for encoded traversal attempts
-        import urllib.parse
-        decoded_path = urllib.parse.unquote(suggested_path)
-        if decoded_path != suggested_path:
-            # Path was URL-encoded, check decoded version too
-            for pattern in dangerous_patterns:
-                if pattern in decoded_path:
-                    return False, f"URL-decoded path contains dangerous pattern '{pattern}' (potential security threat)"
+        # Enhanced path traversal patterns (see _DANGEROUS_RE)
+        match = _DANGEROUS_RE.search(suggested_path)
+        if match:
+            return False, f"Path contains dangerous pattern '{match.group()}' (potential security threat)"
+
+        # Check for encoded traversal attempts (only percent-encoded paths can decode differently)
+        if '%' in suggested_path:
+            decoded_path = unquote(suggested_path)
+            if decoded_path != suggested_path:
+                # Path was URL-encoded, check decoded version too
+                match = _DANGEROUS_RE.search(decoded_path)
+                if match:
+                    return False, f"URL-decoded path contains dangerous pattern '{match.group()}' (potential security threat)"
 
         # Absolute paths could bypass base_destination
         if os.path.isabs(suggested_path):
             return False, "Absolute paths not allowed for security"
 
         # Check for drive letter manipulation (Windows-specific)
-        if os.name == 'nt':
+        if _IS_WINDOWS:
             if len(suggested_path) >= 2 and suggested_path[1] == ':' and suggested_path[0].isalpha():
                 return False, "Drive letter manipulation not allowed"
 
@@ -563,6 +1014,42 @@ class ActionManager:
         except (ValueError, OSError) as e:
             return False, f"Path escapes base directory: {str(e)}"
 
+    def _validated_dest_dir(self, suggested_path: str) -> Path:
+        """
+        Validate suggested_path and join it under the base destination.
+
+        Many files share a suggested directory, so the outcome (directory or
+        validation error) is cached per suggested_path. The cache is bounded and
+        cleared whenever the base destination changes.
+
+        Raises:
+            ValueError: If path validation fails (path traversal attempt)
+        """
+        # Use configured base destination (CRITICAL FIX #2)
+        base_dir = self._base_destination_dir()
+
+        cached = self._dest_dir_cache.get(suggested_path)
+        if cached is None:
+            # Validate path safety (MEDIUM #3 FIX - Security)
+            is_safe, error_msg = self._validate_path_safety(suggested_path, base_dir)
+            if not is_safe:
+                cached = (None, f"Path validation failed: {error_msg}")
+            elif Path(suggested_path).is_absolute():
+                # This should already be blocked by _validate_path_safety, but double-check
+                cached = (None, "Absolute paths not allowed")
+            else:
+                # Remove any leading slashes to avoid accidental absolute joining
+                cached = (base_dir / Path(suggested_path.lstrip('/')), None)
+
+            if len(self._dest_dir_cache) >= self._DEST_DIR_CACHE_SIZE:
+                self._dest_dir_cache.clear()
+            self._dest_dir_cache[suggested_path] = cached
+
+        dest_dir, error = cached
+        if dest_dir is None:
+            raise ValueError(error)
+        return dest_dir
+
     def _build_destination_path(self, source_path: Path, suggested_path: str,
                                 suggested_rename: Optional[str] = None) -> Path:
         """
@@ -579,25 +1066,7 @@ class ActionManager:
         Raises:
             ValueError: If path validation fails (path traversal attempt)
         """
-        # Use configured base destination (CRITICAL FIX #2)
-        try:
-            base_dir = Path(self.config.base_destination).expanduser().resolve()
-        except (AttributeError, OSError):
-            base_dir = Path.home()  # Fallback only on error
-
-        # Validate path safety (MEDIUM #3 FIX - Security)
-        is_safe, error_msg = self._validate_path_safety(suggested_path, base_dir)
-        if not is_safe:
-            raise ValueError(f"Path validation failed: {error_msg}")
-
-        # Handle absolute vs relative suggested paths
-        suggested_obj = Path(suggested_path)
-        if suggested_obj.is_absolute():
-            # This should already be blocked by _validate_path_safety, but double-check
-            raise ValueError("Absolute paths not allowed")
-        else:
-            # Remove any leading slashes to avoid accidental absolute joining
-            dest_dir = base_dir / Path(suggested_path.lstrip('/'))
+        dest_dir = self._validated_dest_dir(suggested_path)
 
         # Determine filename
         filename = suggested_rename if suggested_rename else source_path.name
@@ -617,6 +1086,117 @@ class ActionManager:
 
         return dest_path
 
+    @contextmanager
+    def batch_scope(self):
+        """
+        Memoize existence checks for the duration of a batch of operations.
+
+        Paths this manager moves or deletes are kept up to date in the cache;
+        changes made by other processes during the batch are not noticed.
+
+        Example:
+            >>> with action_manager.batch_scope():
+            ...     for f in files:
+            ...         action_manager.archive_file(f)
+        """
+        outer = self._exists_cache
+        if outer is None:
+            self._exists_cache = {}
+            self._dir_names_cache = {}
+        try:
+            yield self
+        finally:
+            if outer is None:
+                self._exists_cache = None
+                self._dir_names_cache = None
+
+    def _cached_exists(self, path: Path) -> bool:
+        """Path.exists(), answered from the batch cache when one is active."""
+        cache = self._exists_cache
+        if cache is None:
+            return path.exists()
+        key = str(path)
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = path.exists()
+        return result
+
+    def _dir_names(self, directory: Path) -> Optional[set]:
+        """
+        Listing of directory for conflict checks, cached while inside batch_scope().
+
+        Returns None outside a batch (callers list the directory themselves)
+        or when the directory cannot be read.
+        """
+        cache = self._dir_names_cache
+        if cache is None:
+            return None
+        key = str(directory)
+        names = cache.get(key)
+        if names is None:
+            names = _list_names(directory)
+            if names is not None:
+                cache[key] = names
+        return names
+
+    def _mark_exists(self, path: Path, exists: bool) -> None:
+        """Record a path this manager just created or removed in the batch cache."""
+        if self._exists_cache is not None:
+            self._exists_cache[str(path)] = exists
+
+    def _invalidate_exists(self) -> None:
+        """Forget all memoized existence checks and listings (after untracked writes)."""
+        if self._exists_cache is not None:
+            self._exists_cache.clear()
+            self._dir_names_cache.clear()
+
+    def _archive_subdir(self) -> str:
+        """Current "YYYY/MM" archive folder, recomputed at most once a minute."""
+        now = time.monotonic()
+        stamp, subdir = self._archive_subdir_cache
+        if not subdir or now - stamp > 60:
+            lt = time.localtime()
+            subdir = "%04d/%02d" % (lt.tm_year, lt.tm_mon)
+            self._archive_subdir_cache = (now, subdir)
+        return subdir
+
+    def _fast_move(self, src: str, dst: str) -> None:
+        """
+        Move src to dst with a single os.replace when possible.
+
+        Falls back to shutil.move (copy + delete) when the rename fails with
+        EXDEV. Directory pairs that turned out to be on different devices are
+        remembered so later moves between them skip the failing rename.
+        """
+        key = (os.path.dirname(src), os.path.dirname(dst))
+        if key not in self._cross_device_dirs:
+            try:
+                os.replace(src, dst)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            if len(self._cross_device_dirs) >= self._KNOWN_DIRS_SIZE:
+                self._cross_device_dirs.clear()
+            self._cross_device_dirs.add(key)
+        shutil.move(src, dst)
+
+    def _ensure_dir(self, directory, refresh: bool = False) -> None:
+        """
+        Create directory (a Path or str, with parents) unless this manager already did.
+
+        Batches usually move many files into the same few folders, so known
+        directories skip the mkdir syscalls. Pass refresh=True when an
+        operation found the directory missing after all.
+        """
+        key = str(directory)
+        if not refresh and key in self._known_dirs:
+            return
+        os.makedirs(key, exist_ok=True)
+        if len(self._known_dirs) >= self._KNOWN_DIRS_SIZE:
+            self._known_dirs.clear()
+        self._known_dirs.add(key)
+
     def _perform_action(self, source: Path, destination: Path, action: str) -> Dict[str, Any]:
         """
         Actually perform file operation with race condition protection.
@@ -629,49 +1209,81 @@ class ActionManager:
         Returns:
             Dict: Result information
         """
+        src_str = str(source)
         try:
             # Re-check file exists just before operation (CRITICAL FIX #3)
             if not source.exists():
                 raise FileOperationError(
                     f'File no longer exists at {source}',
-                    file_path=str(source),
+                    file_path=src_str,
                     operation=action
                 )
 
-            # Use filelock to prevent concurrent access
-            lock_path = str(source) + '.lock'
-            with FileLock(lock_path, timeout=10):
-                # Check if file is locked/in use (CRITICAL FIX #3)
-                try:
-                    with open(source, 'rb+') as _f:
-                        pass
-                except (IOError, PermissionError) as e:
-                    raise FileOperationError(
-                        f'File is locked or in use: {str(e)}',
-                        file_path=str(source),
-                        operation=action
-                    ) from e
+            # Serialize concurrent moves of the same file. Cross-process locking
+            # is only used when other processes may operate on the same files:
+            # flock on the source itself on POSIX, a FileLock sidecar on Windows
+            # (where an open handle on the source would block the rename).
+            if getattr(self.config, 'multi_process_safe', False) is True:
+                if fcntl is not None:
+                    path_lock = _lock_source(src_str)
+                else:
+                    from filelock import FileLock
+                    path_lock = FileLock(src_str + '.lock', timeout=10)
+            else:
+                path_lock = self._acquire_path_lock(src_str)
 
+            with path_lock:
                 # Ensure destination directory exists
-                destination.parent.mkdir(parents=True, exist_ok=True)
-
-                # Perform move/rename
-                shutil.move(str(source), str(destination))
-
+                self._ensure_dir(destination.parent)
+
+                # Claim the target name atomically; the planned name may have
+                # been taken since the destination path was built
+                placeholder = None
+                if destination != source:
+                    try:
+                        destination = placeholder = _reserve_unique_path(destination)
+                    except FileNotFoundError:
+                        # Directory was removed after we created it
+                        self._ensure_dir(destination.parent, refresh=True)
+                        destination = placeholder = _reserve_unique_path(destination)
+
+                # Perform move/rename over the placeholder: a single atomic
+                # rename on the same filesystem, copy + delete across devices
+                try:
+                    self._fast_move(src_str, str(destination))
+                except BaseException:
+                    if placeholder is not None:
+                        try:
+                            placeholder.unlink()
+                        except OSError:
+                            pass
+                    raise
+                self._mark_exists(source, False)
+                self._mark_exists(destination, True)
+
+            dst_str = str(destination)
             return {
                 'success': True,
                 'action': action,
-                'old_path': str(source),
-                'new_path': str(destination),
-                'message': f'Successfully {action}d file to {destination}'
+                'old_path': src_str,
+                'new_path': dst_str,
+                'message': f'Successfully {action}d file to {dst_str}'
             }
 
         except FileOperationError:
             raise  # Re-raise our custom exceptions
         except (OSError, IOError) as e:
+            # A locked/in-use file makes the move itself fail, so there is no
+            # need to probe it with an extra open() beforehand (CRITICAL FIX #3)
+            if _is_file_in_use_error(e):
+                raise FileOperationError(
+                    f'File is locked or in use: {str(e)}',
+                    file_path=src_str,
+                    operation=action
+                ) from e
             raise FileOperationError(
                 f'OS error during {action}: {str(e)}',
-                file_path=str(source),
+                file_path=src_str,
                 destination=str(destination),
                 operation=action
             ) from e
@@ -679,7 +1291,7 @@ class ActionManager:
             # Catch any unexpected exceptions and wrap them
             raise FileOperationError(
                 f'Unexpected error during {action}: {str(e)}',
-                file_path=str(source),
+                file_path=src_str,
                 destination=str(destination),
                 operation=action
             ) from e
@@ -718,7 +1330,7 @@ class ActionManager:
         try:
             path = Path(file_path)
 
-            if not path.exists():
+            if not self._cached_exists(path):
                 return {
                     'success': False,
                     'action': 'delete',
@@ -727,28 +1339,23 @@ class ActionManager:
 
             if self.dry_run:
                 message = f'[DRY RUN] Would delete {path}'
-                try:
-                    self._logger.log_operation('DELETE', str(path), str(path), 'DELETED', 'DRY_RUN')
-                except Exception:
-                    pass
+                self._safe_log('DELETE', str(path), str(path), 'DELETED', 'DRY_RUN')
             else:
                 path.unlink()
+                self._mark_exists(path, False)
                 message = f'Deleted {path}'
 
                 # Log deletion
-                time_saved = self.config.time_estimates.get('delete', 0.2)
-                self.db_manager.log_action(
+                time_saved = self._time_saved['delete']
+                self._queue_log(LogAction(
                     filename=path.name,
                     old_path=str(path),
                     new_path=None,
                     operation='delete',
                     time_saved=time_saved,
                     user_approved=True
-                )
-                try:
-                    self._logger.log_operation('DELETE', str(path), str(path), 'DELETED', 'SUCCESS')
-                except Exception:
-                    pass
+                ))
+                self._safe_log('DELETE', str(path), str(path), 'DELETED', 'SUCCESS')
 
             return {
                 'success': True,
@@ -775,61 +1382,53 @@ class ActionManager:
         Returns:
             Dict: Result information
         """
-        try:
-            path = Path(file_path)
-
-            if not path.exists():
-                return {
-                    'success': False,
-                    'action': 'archive',
-                    'message': 'File not found'
-                }
-
-            # Default archive location
-            if archive_dir is None:
-                archive_path = Path.home() / "Archive" / datetime.now().strftime("%Y/%m")
-            else:
-                archive_path = Path(archive_dir)
-
-            # Build destination
-            dest_path = archive_path / path.name
+        if self.dry_run:
+            # Preview only: no stat calls, no collision scan
+            base = archive_dir if archive_dir is not None else os.path.join(
+                self._home_archive_str, self._archive_subdir())
+            dest_str = os.path.join(base, os.path.basename(file_path))
+            return {
+                'success': True,
+                'action': 'archive',
+                'old_path': file_path,
+                'new_path': dest_str,
+                'message': f'[DRY RUN] Would archive to {dest_str}'
+            }
 
-            # Handle conflicts
-            if dest_path.exists():
-                counter = 1
-                while dest_path.exists():
-                    dest_path = archive_path / f"{path.stem}_{counter}{path.suffix}"
-                    counter += 1
+        path = Path(file_path)
+        src_str = str(path)
 
-            if self.dry_run:
-                message = f'[DRY RUN] Would archive to {dest_path}'
-            else:
-                # Create archive directory
-                archive_path.mkdir(parents=True, exist_ok=True)
+        # Missing sources are common in batches; answer them without an exception
+        if not self._cached_exists(path):
+            return dict(_ARCHIVE_NOT_FOUND)
 
-                # Move to archive
-                shutil.move(str(path), str(dest_path))
-                message = f'Archived to {dest_path}'
+        # Default archive location
+        if archive_dir is None:
+            archive_path = self._home_archive / self._archive_subdir()
+        else:
+            archive_path = Path(archive_dir)
 
-                # Log action
-                time_saved = self.config.time_estimates.get('archive', 0.4)
-                self.db_manager.log_action(
-                    filename=path.name,
-                    old_path=str(path),
-                    new_path=str(dest_path),
-                    operation='archive',
-                    time_saved=time_saved,
-                    user_approved=True
-                )
+        # Build destination, handling conflicts (name parts split once)
+        name = path.name
+        stem, suffix = os.path.splitext(name)
+        archive_names = self._dir_names(archive_path)
+        # lexists: a dangling symlink still takes the name
+        dest_path = _find_nonconflicting(archive_path, stem, suffix, os.path.lexists, archive_names)
+        dest_str = str(dest_path)
 
-            return {
-                'success': True,
-                'action': 'archive',
-                'old_path': str(path),
-                'new_path': str(dest_path),
-                'message': message
-            }
+        try:
+            # Create archive directory
+            self._ensure_dir(archive_path)
 
+            # Move to archive
+            try:
+                self._fast_move(src_str, dest_str)
+            except FileNotFoundError:
+                if not path.exists():
+                    raise
+                # Archive directory was removed after we created it
+                self._ensure_dir(archive_path, refresh=True)
+                self._fast_move(src_str, dest_str)
         except Exception as e:
             return {
                 'success': False,
@@ -837,6 +1436,30 @@ class ActionManager:
                 'message': f'Error archiving file: {str(e)}'
             }
 
+        self._mark_exists(path, False)
+        self._mark_exists(dest_path, True)
+        if archive_names is not None:
+            archive_names.add(os.path.normcase(dest_path.name))
+
+        # Log action
+        time_saved = self._time_saved['archive']
+        self._queue_log(LogAction(
+            filename=name,
+            old_path=src_str,
+            new_path=dest_str,
+            operation='archive',
+            time_saved=time_saved,
+            user_approved=True
+        ))
+
+        return {
+            'success': True,
+            'action': 'archive',
+            'old_path': src_str,
+            'new_path': dest_str,
+            'message': f'Archived to {dest_str}'
+        }
+
     def undo_last_action(self) -> Dict[str, Any]:
         """
         Undo the last file operation.
@@ -850,6 +1473,13 @@ class ActionManager:
                 'message': 'No actions to undo'
             }
 
+        # The database must see every buffered action before picking the last one
+        if not self.flush_logs():
+            return {
+                'success': False,
+                'message': 'Action log could not be written to the database'
+            }
+
         # Get last action from database
         last_action = self.db_manager.undo_last_action()
 
@@ -859,51 +1489,68 @@ class ActionManager:
                 'message': 'No undoable actions in database'
             }
 
-        try:
-            old_path = Path(last_action['old_path'])
-            new_path = Path(last_action['new_path']) if last_action['new_path'] else None
-
-            if not new_path or not new_path.exists():
-                return {
-                    'success': False,
-                    'message': 'Cannot undo: destination file not found'
-                }
-
-            if self.dry_run:
-                message = f'[DRY RUN] Would undo: move {new_path} back to {old_path}'
-            else:
-                # Ensure original directory exists
-                old_path.parent.mkdir(parents=True, exist_ok=True)
-
-                # Move back
-                shutil.move(str(new_path), str(old_path))
-                message = f'Undone: restored {old_path}'
-
+        if self.dry_run:
+            # Preview only: report from the logged paths without touching disk
             return {
                 'success': True,
                 'action': 'undo',
-                'message': message
+                'message': f"[DRY RUN] Would undo: move {last_action['new_path']} back to {last_action['old_path']}"
+            }
+
+        old_str = last_action['old_path']
+        new_str = last_action['new_path']
+        if not new_str or not os.path.exists(new_str):
+            return {
+                'success': False,
+                'message': 'Cannot undo: destination file not found'
             }
+        old_parent = os.path.dirname(old_str)
 
+        try:
+            # Ensure original directory exists
+            self._ensure_dir(old_parent)
+
+            # Move back
+            try:
+                self._fast_move(new_str, old_str)
+            except FileNotFoundError:
+                if not os.path.exists(new_str):
+                    raise
+                # Original directory was removed after we created it
+                self._ensure_dir(old_parent, refresh=True)
+                self._fast_move(new_str, old_str)
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Error undoing action: {str(e)}'
             }
 
-    def _add_to_undo_history(self, action: Dict[str, Any]):
+        # Drop the matching in-memory entry so undo_history mirrors the database
+        if self.undo_history:
+            _, entry_old, entry_new, _ = self.undo_history[-1]
+            if entry_old == old_str and entry_new == new_str:
+                self.undo_history.pop()
+
+        return {
+            'success': True,
+            'action': 'undo',
+            'message': f'Undone: restored {old_str}'
+        }
+
+    @staticmethod
+    def format_timestamp(ts: float) -> str:
+        """Format an undo entry timestamp as an ISO 8601 string for display."""
+        return datetime.fromtimestamp(ts).isoformat()
+
+    def _add_to_undo_history(self, action: UndoEntry):
         """
-        Add action to undo history.
+        Add action to undo history (oldest entries drop off automatically).
 
         Args:
-            action (Dict): Action details
+            action (UndoEntry): Action details
         """
         self.undo_history.append(action)
 
-        # Keep only recent history
-        if len(self.undo_history) > self.max_undo_history:
-            self.undo_history = self.undo_history[-self.max_undo_history:]
-
     def set_dry_run(self, enabled: bool):
         """
         Enable or disable dry run mode.
@@ -920,6 +1567,7 @@ class ActionManager:
         Returns:
             Dict: Statistics including total actions, time saved, etc.
         """
+        self.flush_logs()
         stats = self.db_manager.get_stats('all')
         
         # Add Safety Guardian statistics
@@ -939,23 +1587,35 @@ class ActionManager:
         Returns:
             Dict: Result of batch organization
         """
-        if not ORGANIZE_AVAILABLE:
+        organize = _organize_module()
+        if organize is None:
             return {
                 'success': False,
                 'message': 'organize library not available'
             }
 
         try:
-            # Use PyFilesystem2 for cross-platform filesystem operations
-            filesystem = fs.open_fs(target_dir)
-
-            # Apply organization rules
-            results = []
-            for rule in rules:
-                # This is a simplified example; actual organize usage would depend on the library's API
-                # Assuming organize has a function to apply rules
-                result = organize.apply_rule(filesystem, rule)
-                results.append(result)
+            # Use PyFilesystem2 for cross-platform filesystem operations.
+            # Plain local paths go straight to OSFS, skipping open_fs URL
+            # parsing and opener lookup; FS URLs still use open_fs.
+            if '://' in target_dir:
+                import fs
+                filesystem = fs.open_fs(target_dir)
+            else:
+                from fs.osfs import OSFS
+                filesystem = OSFS(target_dir)
+
+            # Apply organization rules one after another: rule order matters
+            # (a file moved by one rule is no longer seen by the next), so
+            # rules must not race on the same files
+            # This is a simplified example; actual organize usage would depend on the library's API
+            # Assuming organize has a function to apply rules
+            try:
+                with filesystem:
+                    results = [organize.apply_rule(filesystem, rule) for rule in rules]
+            finally:
+                # organize changes files behind our back; drop memoized checks
+                self._invalidate_exists()
 
             return {
                 'success': True,
@@ -968,6 +1628,8 @@ class ActionManager:
                 'success': False,
                 'message': f'Batch organization failed: {str(e)}'
             }
+        finally:
+            self.flush_logs()
 
 
 if __name__ == "__main__":
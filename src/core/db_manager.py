@@ -20,15 +20,200 @@ Author: Alexandru Emanuel Vasile
 License: Proprietary (200-key limited release)
 """
 
+import os
 import sqlite3
 import hashlib
+import logging
+import functools
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Any, NamedTuple, Union
 from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 import threading
 import queue
 import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Explicit adapters for the date/datetime values bound by stats and license
+# writes. The built-in ones are deprecated since Python 3.12; these bind the
+# C-level isoformat directly and produce the same text as before.
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, functools.partial(datetime.isoformat, sep=' '))
+
+
+class LogAction(NamedTuple):
+    """One files_log row for bulk_log_actions, fields in INSERT column order."""
+    filename: str
+    old_path: str
+    new_path: Optional[str]
+    operation: str
+    time_saved: float = 0.0
+    category: Optional[str] = None
+    ai_suggested: bool = False
+    user_approved: bool = False
+    raw_response: Optional[str] = None
+    model_name: Optional[str] = None
+    prompt_hash: Optional[str] = None
+
+
+# SQL for the recurring queries, defined once so every call hands sqlite3 the
+# same text and hits the per-connection compiled statement cache
+_SQL_INSERT_LOG = """
+    INSERT INTO files_log
+    (filename, old_path, new_path, operation, time_saved, category, ai_suggested, user_approved,
+     raw_response, model_name, prompt_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Named explicitly: without ANALYZE statistics the planner prefers
+# idx_files_operation plus a sort over the small partial index
+_SQL_LAST_UNDOABLE = """
+    SELECT * FROM files_log INDEXED BY idx_files_undoable
+    WHERE operation IN ('move', 'rename')
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+
+_SQL_RECENT_LOGS = """
+    SELECT id, filename, old_path, new_path, operation, timestamp, time_saved, category,
+           ai_suggested, user_approved, model_name
+    FROM files_log
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# Rows of every hash seen more than once, each hash's rows adjacent
+# Ordered by one size per hash so rows of a group stay contiguous for groupby()
+# even when the recorded sizes of same-hash files differ
+_SQL_DUPLICATE_ROWS = """
+    SELECT d.file_hash, d.file_path, g.group_size AS file_size
+    FROM duplicates d
+    JOIN (
+        SELECT file_hash, MAX(file_size) AS group_size
+        FROM duplicates GROUP BY file_hash HAVING COUNT(*) > 1
+    ) g ON g.file_hash = d.file_hash
+    ORDER BY g.group_size DESC, d.file_hash
+"""
+
+_SQL_STATS_SELECT = """
+    SELECT
+        SUM(files_organised) as total_files,
+        SUM(time_saved_minutes) as total_time_saved,
+        SUM(duplicates_removed) as total_duplicates,
+        SUM(ai_classifications) as total_ai_classifications
+    FROM stats
+"""
+
+# Stats queries per period; 'all' reads the running totals row instead of
+# summing every day
+_SQL_STATS = {
+    'today': _SQL_STATS_SELECT + "WHERE stat_date = date('now')",
+    'week': _SQL_STATS_SELECT + "WHERE stat_date >= date('now', '-7 days')",
+    'month': _SQL_STATS_SELECT + "WHERE stat_date >= date('now', '-30 days')",
+    'all': """
+        SELECT
+            total_files,
+            total_time as total_time_saved,
+            total_dups as total_duplicates,
+            total_ai as total_ai_classifications
+        FROM stats_totals
+        WHERE id = 1
+    """,
+}
+
+# Running all-time totals, updated in the same transaction as the stats row
+# (files_log inserts update both through trg_files_log_stats)
+_SQL_ADD_DUPLICATE_TOTAL = "UPDATE stats_totals SET total_dups = total_dups + ? WHERE id = 1"
+
+# bulk_log_actions switches trg_files_log_stats off (a row in bulk_log_active,
+# only visible inside its own write transaction) and writes the stats for the
+# whole batch with these two statements instead
+_SQL_UPSERT_STATS_TOTALS = """
+    INSERT INTO stats (stat_date, files_organised, time_saved_minutes, ai_classifications)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(stat_date) DO UPDATE SET
+        files_organised = files_organised + excluded.files_organised,
+        time_saved_minutes = time_saved_minutes + excluded.time_saved_minutes,
+        ai_classifications = ai_classifications + excluded.ai_classifications
+"""
+
+_SQL_ADD_TOTALS = """
+    UPDATE stats_totals SET
+        total_files = total_files + ?,
+        total_time = total_time + ?,
+        total_ai = total_ai + ?
+    WHERE id = 1
+"""
+
+# Deferred queue statements, hit by every schedule_* call and sweep.
+# eligible_at keeps the readable local time; due checks compare the
+# integer eligible_at_epoch (Unix seconds) against a bound time.time()
+_SQL_ENQUEUE_DEFERRED = """
+    INSERT INTO deferred_queue (file_path, eligible_at, eligible_at_epoch, guardian_token, status)
+    VALUES (?, ?, ?, ?, 'queued')
+"""
+
+# Pre-3.35 claim: read, then mark 'processing' in the same transaction
+# (status is reported as it will be once the claim commits)
+_SQL_DUE_DEFERRED = """
+    SELECT id, file_path, detected_at, eligible_at, eligible_at_epoch, 'processing' AS status, guardian_token
+    FROM deferred_queue
+    WHERE status = 'queued' AND eligible_at_epoch <= ?
+    ORDER BY eligible_at_epoch ASC, id ASC
+    LIMIT ?
+"""
+
+# Claims due items in the same statement that reads them (SQLite >= 3.35)
+_SQL_CLAIM_DUE_DEFERRED = """
+    UPDATE deferred_queue SET status = 'processing'
+    WHERE id IN (
+        SELECT id FROM deferred_queue
+        WHERE status = 'queued' AND eligible_at_epoch <= ?
+        ORDER BY eligible_at_epoch ASC, id ASC
+        LIMIT ?
+    )
+    RETURNING id, file_path, detected_at, eligible_at, eligible_at_epoch, status, guardian_token
+"""
+
+_SQL_REQUEUE_PROCESSING = "UPDATE deferred_queue SET status = 'queued' WHERE status = 'processing'"
+
+_SQL_NEXT_ELIGIBLE = "SELECT MIN(eligible_at_epoch) FROM deferred_queue WHERE status = 'queued'"
+
+_SQL_MARK_DEFERRED = "UPDATE deferred_queue SET status = ?, last_error = ? WHERE id = ?"
+
+
+# STRICT tables (SQLite >= 3.37) store each column in its declared type;
+# older libraries get the same tables without the keyword
+_STRICT = " STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else ""
+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+@functools.cache
+def _mmap_size() -> int:
+    """
+    Bytes of the database to memory-map: a quarter of available RAM, capped
+    at 4 GiB. Falls back to 256 MB where available memory cannot be read.
+    """
+    size = 256 * 1024 * 1024
+    try:
+        available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        available = 0
+    if available > 0:
+        size = max(size, min(available // 4, 4 * 1024 ** 3))
+    logger.debug(f"SQLite mmap_size set to {size} bytes")
+    return size
+
+
+# Database files whose file-level settings (page size, WAL) were already
+# applied by this process; they persist in the file, so once is enough
+_prepared_files: set = set()
+_prepared_files_lock = threading.Lock()
 
 
 class ConnectionPool:
@@ -36,9 +221,29 @@ class ConnectionPool:
     Thread-safe SQLite connection pool for improved performance.
 
     Maintains a pool of reusable database connections to reduce connection overhead.
+    Each thread keeps the first connection it gets (up to half the pool), so
+    repeat calls from the same thread skip the queue. Connections pinned by
+    threads that have exited go back to the pool; call release_thread() to
+    hand one back early.
     """
 
-    def __init__(self, db_path: str, max_connections: int = 10, timeout: float = 30.0):
+    # Returned connections are probed with SELECT 1 only once per this many returns
+    HEALTH_CHECK_INTERVAL = 256
+
+    # Compiled statements kept per connection (sqlite3 default is 128)
+    CACHED_STATEMENTS = 256
+
+    # Per-connection PRAGMAs applied to every new connection; mmap_size
+    # defaults to _mmap_size(). Overridable per pool (config key database.pragmas)
+    DEFAULT_PRAGMAS = {
+        'synchronous': 'NORMAL',  # Balance between performance and safety
+        'cache_size': -65536,  # Page cache in KiB (64 MiB)
+        'temp_store': 'MEMORY',  # Store temp tables in memory
+        'mmap_size': None,  # Memory-mapped reads (see _mmap_size)
+    }
+
+    def __init__(self, db_path: str, max_connections: int = 10, timeout: float = 30.0,
+                 pragmas: Optional[Dict[str, Any]] = None):
         """
         Initialize the connection pool.
 
@@ -46,32 +251,51 @@ class ConnectionPool:
             db_path (str): Path to the SQLite database file
             max_connections (int): Maximum number of connections in the pool
             timeout (float): Timeout for acquiring connections from the pool
+            pragmas (Dict, optional): Overrides for DEFAULT_PRAGMAS
+
+        Raises:
+            ValueError: If a pragma is unknown or its value is not a plain
+                integer or keyword
         """
+        settings = dict(self.DEFAULT_PRAGMAS)
+        for name, value in (pragmas or {}).items():
+            if name not in settings or not (isinstance(value, int) or str(value).isalnum()):
+                raise ValueError(f"Unsupported connection pragma: {name}={value!r}")
+            settings[name] = value
+        if settings['mmap_size'] is None:
+            settings['mmap_size'] = _mmap_size()
+        # One script per new connection instead of a call per PRAGMA
+        self._pragma_script = "".join(f"PRAGMA {name}={value};" for name, value in settings.items())
+
         self.db_path = db_path
         self.max_connections = max_connections
         self.timeout = timeout
         self._pool = queue.Queue(maxsize=max_connections)
         self._lock = threading.Lock()
         self._active_connections = 0
+        self._returns = 0
+        # Connections are opened on first use, so a process that never
+        # touches the database never pays for them
 
-        # Pre-populate the pool with initial connections
-        for _ in range(min(3, max_connections)):  # Start with 3 connections
-            self._create_connection()
+        # Per-thread pinned connections ({thread: conn} for reaping dead threads)
+        self._local = threading.local()
+        self._pinned: Dict[threading.Thread, sqlite3.Connection] = {}
 
     def _create_connection(self) -> sqlite3.Connection:
         """Create a new database connection with optimized settings."""
-        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        # Pooled connections move between threads (one user at a time, e.g.
+        # ActionManager's log flush timer), so sqlite3's same-thread check has to be off
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None,
+                               cached_statements=self.CACHED_STATEMENTS, check_same_thread=False)
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
-        conn.execute("PRAGMA synchronous=NORMAL")  # Balance between performance and safety
-        conn.execute("PRAGMA cache_size=10000")  # Increase cache size (10MB)
-        conn.execute("PRAGMA temp_store=MEMORY")  # Store temp tables in memory
-        conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
+        # Per-connection settings only; journal_mode=WAL is stored in the
+        # database file and set once by DatabaseManager._prepare_database_file
+        conn.executescript(self._pragma_script)
         return conn
 
     def get_connection(self) -> sqlite3.Connection:
         """
-        Get a connection from the pool.
+        Get this thread's pinned connection, or one from the pool.
 
         Returns:
             sqlite3.Connection: Database connection
@@ -79,15 +303,63 @@ class ConnectionPool:
         Raises:
             queue.Empty: If no connection is available within timeout
         """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        self._reap_dead_threads()
+        conn = self._checkout()
+        with self._lock:
+            # Keep half the pool unpinned so threads that are not pinned can still get one
+            pin = len(self._pinned) < self.max_connections // 2
+            if pin:
+                self._pinned[threading.current_thread()] = conn
+        if pin:
+            self._local.conn = conn
+        return conn
+
+    def pin_thread(self) -> sqlite3.Connection:
+        """
+        Pin a connection to the calling thread even past the half-pool limit.
+
+        For long-lived worker threads that should never wait on the queue;
+        pair with release_thread() when the worker finishes.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        self._reap_dead_threads()
+        conn = self._checkout()
+        with self._lock:
+            self._pinned[threading.current_thread()] = conn
+        self._local.conn = conn
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        """Take an idle pooled connection, open a new one, or wait for one."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        # No idle connection: open another while under the limit, else wait
+        with self._lock:
+            create = self._active_connections < self.max_connections
+            if create:
+                self._active_connections += 1
+        if create:
+            try:
+                return self._create_connection()
+            except Exception:
+                with self._lock:
+                    self._active_connections -= 1
+                raise
+
         try:
             return self._pool.get(timeout=self.timeout)
         except queue.Empty:
-            with self._lock:
-                if self._active_connections < self.max_connections:
-                    self._active_connections += 1
-                    return self._create_connection()
-                else:
-                    raise queue.Empty("Connection pool exhausted")
+            raise queue.Empty("Connection pool exhausted")
 
     def return_connection(self, conn: sqlite3.Connection) -> None:
         """
@@ -96,9 +368,35 @@ class ConnectionPool:
         Args:
             conn (sqlite3.Connection): Connection to return
         """
+        if conn is getattr(self._local, 'conn', None):
+            return  # Pinned to this thread; stays checked out
+        self._release(conn)
+
+    def release_thread(self) -> None:
+        """Return the calling thread's pinned connection to the pool (e.g. at worker teardown)."""
+        conn = self._local.__dict__.pop('conn', None)
+        if conn is None:
+            return
+        with self._lock:
+            self._pinned.pop(threading.current_thread(), None)
+        self._release(conn)
+
+    def _reap_dead_threads(self) -> None:
+        """Return connections pinned by threads that have exited to the pool."""
+        with self._lock:
+            dead = [thread for thread in self._pinned if not thread.is_alive()]
+            conns = [self._pinned.pop(thread) for thread in dead]
+        for conn in conns:
+            self._release(conn)
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Put a connection back in the queue, closing it if it is broken or not needed."""
         try:
-            # Test if connection is still valid
-            conn.execute("SELECT 1").fetchone()
+            # Connections are long-lived and in-process, so a liveness probe on
+            # every return is wasted work; check only periodically
+            self._returns += 1
+            if self._returns % self.HEALTH_CHECK_INTERVAL == 0:
+                conn.execute("SELECT 1").fetchone()
             self._pool.put_nowait(conn)
         except (sqlite3.Error, queue.Full):
             # Connection is invalid or pool is full, close it
@@ -111,6 +409,16 @@ class ConnectionPool:
 
     def close_all(self) -> None:
         """Close all connections in the pool."""
+        with self._lock:
+            pinned = list(self._pinned.values())
+            self._pinned.clear()
+        self._local = threading.local()
+        for conn in pinned:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
         while not self._pool.empty():
             try:
                 conn = self._pool.get_nowait()
@@ -129,15 +437,16 @@ class DatabaseManager:
     Attributes:
         db_path (Path): Path to SQLite database file
         connection_pool (ConnectionPool): Connection pool for database operations
-        _prepared_statements (dict): Cache of prepared statements for performance
     """
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pragmas: Optional[Dict[str, Any]] = None):
         """
         Initialize database manager and create tables if they don't exist.
 
         Args:
             db_path (str, optional): Path to database file. Defaults to data/database/organiser.db
+            pragmas (Dict, optional): Per-connection PRAGMA overrides
+                (see ConnectionPool.DEFAULT_PRAGMAS)
         """
         if db_path is None:
             # Default to data/database/organiser.db in project root
@@ -148,14 +457,52 @@ class DatabaseManager:
         # Ensure database directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize connection pool
-        self.connection_pool = ConnectionPool(str(self.db_path))
+        self._prepare_database_file()
 
-        # Cache for prepared statements
-        self._prepared_statements = {}
+        # Initialize connection pool
+        self.connection_pool = ConnectionPool(str(self.db_path), pragmas=pragmas)
+        # Last-resort close when the manager is collected or at interpreter
+        # exit; holds the pool, not self, so the manager is never resurrected
+        self._finalizer = weakref.finalize(self, self.connection_pool.close_all)
 
         self._initialize_database()
 
+    PAGE_SIZE = 8192
+
+    # WAL pages between automatic checkpoints (bulk_log_actions checkpoints explicitly)
+    WAL_AUTOCHECKPOINT = 1000
+
+    # bulk_log_actions batches at least this large checkpoint once themselves;
+    # smaller ones (e.g. the 0.5 s write-behind flushes) leave it to autocheckpoint
+    BULK_CHECKPOINT_ROWS = 64
+
+    def _prepare_database_file(self) -> None:
+        """
+        Apply the settings stored in the database file itself, once.
+
+        A brand-new database gets PAGE_SIZE pages: larger pages keep the wide
+        files_log B-tree shallower. The page size is fixed once the file is
+        written (and WAL mode cannot change it), so this only acts while the
+        database is still empty; the VACUUM that applies it is then a no-op
+        in cost. journal_mode=WAL persists in the file as well, so it is set
+        here rather than on every pooled connection, and only by the first
+        DatabaseManager for this file in the process.
+        """
+        key = os.path.abspath(self.db_path)
+        with _prepared_files_lock:
+            # (a file deleted and recreated since then needs them again)
+            if key in _prepared_files and os.path.exists(key):
+                return
+            conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+            try:
+                if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                    conn.execute(f"PRAGMA page_size={self.PAGE_SIZE}")
+                    conn.execute("VACUUM")
+                conn.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
+            finally:
+                conn.close()
+            _prepared_files.add(key)
+
     @contextmanager
     def get_connection(self):
         """
@@ -175,38 +522,63 @@ class DatabaseManager:
         finally:
             self.connection_pool.return_connection(conn)
 
-    def _get_prepared_statement(self, sql: str) -> str:
+    @contextmanager
+    def dedicated_connection(self):
         """
-        Get or cache a prepared statement.
+        Reserve one connection for the calling thread until the block exits.
 
-        Args:
-            sql (str): SQL statement
+        Every DatabaseManager call made by this thread inside the block runs
+        on that connection, without going through the pool queue.
 
-        Returns:
-            str: The SQL statement (cached for future use)
+        Yields:
+            sqlite3.Connection: The thread's dedicated connection
+        """
+        conn = self.connection_pool.pin_thread()
+        try:
+            yield conn
+        finally:
+            self.connection_pool.release_thread()
+
+    @staticmethod
+    @contextmanager
+    def _synchronous_off(conn: sqlite3.Connection, enabled: bool = True):
+        """
+        Run one batch transaction with PRAGMA synchronous=OFF.
+
+        No fsync is issued for the commit or any checkpoint it triggers; the
+        transaction stays atomic but may be lost on power failure, so only
+        use this for data that is cheap to replay. The connection's own
+        synchronous level is restored afterwards. The pragma cannot change
+        inside a transaction, so wrap the whole BEGIN..COMMIT.
         """
-        if sql not in self._prepared_statements:
-            self._prepared_statements[sql] = sql
-        return self._prepared_statements[sql]
+        if not enabled:
+            yield
+            return
+        previous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        conn.execute("PRAGMA synchronous=OFF")
+        try:
+            yield
+        finally:
+            conn.execute(f"PRAGMA synchronous={int(previous)}")
 
-    def execute_batch(self, operations: List[Tuple[str, Tuple]]) -> List[Any]:
+    def execute_batch(self, operations: List[Tuple[str, Tuple]], fast: bool = False) -> List[Any]:
         """
         Execute multiple database operations in a single transaction.
 
         Args:
             operations (List[Tuple[str, Tuple]]): List of (sql, params) tuples
+            fast (bool): Skip the commit fsync (see _synchronous_off)
 
         Returns:
             List[Any]: List of results from each operation
         """
         results = []
-        with self.get_connection() as conn:
+        with self.get_connection() as conn, self._synchronous_off(conn, fast):
             cursor = conn.cursor()
             try:
                 cursor.execute("BEGIN IMMEDIATE")
                 for sql, params in operations:
-                    prepared_sql = self._get_prepared_statement(sql)
-                    cursor.execute(prepared_sql, params)
+                    cursor.execute(sql, params)
                     results.append(cursor.lastrowid or cursor.rowcount)
                 conn.commit()
                 return results
@@ -214,62 +586,71 @@ class DatabaseManager:
                 conn.rollback()
                 raise e
 
-    def bulk_log_actions(self, actions: List[Dict[str, Any]]) -> List[int]:
+    def bulk_log_actions(self, actions: List[Union[LogAction, Dict[str, Any]]]) -> List[int]:
         """
         Bulk log multiple file actions efficiently.
 
         Args:
-            actions (List[Dict]): List of action dictionaries
+            actions (List[LogAction | Dict]): Log rows; dicts (with LogAction's
+                keys) are converted once
 
         Returns:
             List[int]: List of log IDs
         """
-        operations = []
-        stats_updates = []
+        if not actions:
+            return []
 
+        # Build the log rows and the day's stats totals in one pass
+        log_rows = []
+        total_time = 0.0
+        total_ai = 0
         for action in actions:
-            # Prepare log insert operation
-            log_sql = """
-                INSERT INTO files_log
-                (filename, old_path, new_path, operation, time_saved, category, ai_suggested, user_approved,
-                 raw_response, model_name, prompt_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            log_params = (
-                action['filename'], action['old_path'], action.get('new_path'),
-                action['operation'], action.get('time_saved', 0.0), action.get('category'),
-                action.get('ai_suggested', False), action.get('user_approved', False),
-                action.get('raw_response'), action.get('model_name'), action.get('prompt_hash')
-            )
-            operations.append((log_sql, log_params))
-
-            # Prepare stats update operation
-            today = datetime.now().date()
-            stats_sql = """
-                INSERT INTO stats (stat_date, files_organised, time_saved_minutes, ai_classifications)
-                VALUES (?, 1, ?, ?)
-                ON CONFLICT(stat_date) DO UPDATE SET
-                    files_organised = files_organised + 1,
-                    time_saved_minutes = time_saved_minutes + ?,
-                    ai_classifications = ai_classifications + ?
-            """
-            time_saved = action.get('time_saved', 0.0)
-            ai_suggested = action.get('ai_suggested', False)
-            stats_params = (today, time_saved, 1 if ai_suggested else 0, time_saved, 1 if ai_suggested else 0)
-            operations.append((stats_sql, stats_params))
-
-        # Execute all operations in batch
-        results = self.execute_batch(operations)
-
-        # Extract log IDs (every other result, starting from index 0)
-        log_ids = []
-        for i in range(0, len(results), 2):
-            log_id = results[i]
-            if log_id is None:
-                raise RuntimeError("Failed to get log ID after batch insert")
-            log_ids.append(log_id)
-
-        return log_ids
+            if not isinstance(action, LogAction):
+                action = LogAction(**{'new_path': None, **action})
+            # LogAction fields are already in INSERT column order
+            log_rows.append(action)
+            total_time += action.time_saved
+            if action.ai_suggested:
+                total_ai += 1
+
+        large = len(log_rows) >= self.BULK_CHECKPOINT_ROWS
+        with self.get_connection() as conn:
+            if large:
+                # No automatic checkpoint on this commit; one explicit PASSIVE
+                # checkpoint follows once the write lock is released
+                conn.execute("PRAGMA wal_autocheckpoint=0")
+            try:
+                # Action logs are an audit trail of moves already made; skip the fsync
+                with self._synchronous_off(conn):
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute("BEGIN IMMEDIATE")
+                        # Per-row stats trigger off for this transaction only
+                        cursor.execute("INSERT INTO bulk_log_active (id) VALUES (1)")
+                        cursor.executemany(_SQL_INSERT_LOG, log_rows)
+                        # executemany leaves lastrowid unset; the write lock held since
+                        # BEGIN IMMEDIATE keeps this batch's AUTOINCREMENT ids contiguous
+                        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                        if not last_id:
+                            raise RuntimeError("Failed to get log ID after batch insert")
+                        cursor.execute("DELETE FROM bulk_log_active")
+                        # One stats write for the whole batch, not one per action on the same row
+                        count = len(log_rows)
+                        cursor.execute(_SQL_UPSERT_STATS_TOTALS, (datetime.now().date(), count, total_time, total_ai))
+                        cursor.execute(_SQL_ADD_TOTALS, (count, total_time, total_ai))
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        raise e
+                if large:
+                    # Runs with the pool's synchronous level again, so the database file is synced
+                    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            finally:
+                if large:
+                    conn.execute(f"PRAGMA wal_autocheckpoint={self.WAL_AUTOCHECKPOINT}")
+
+        first_id = last_id - len(log_rows) + 1
+        return list(range(first_id, last_id + 1))
 
     def _initialize_database(self) -> None:
         """
@@ -282,54 +663,60 @@ class DatabaseManager:
             # Performance optimization pragmas
             cursor.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
             cursor.execute("PRAGMA busy_timeout = 30000")  # 30 second timeout
-            cursor.execute("PRAGMA wal_autocheckpoint = 1000")  # Auto-checkpoint WAL
+            cursor.execute(f"PRAGMA wal_autocheckpoint = {self.WAL_AUTOCHECKPOINT}")  # Auto-checkpoint WAL
             cursor.execute("PRAGMA optimize")  # Run optimization
 
             # Files log table
-            cursor.execute("""
+            # Only newly created tables pick up STRICT; existing ones are left as they are
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS files_log (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     filename TEXT NOT NULL,
                     old_path TEXT NOT NULL,
                     new_path TEXT,
                     operation TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                     time_saved REAL DEFAULT 0.0,
                     category TEXT,
-                    ai_suggested BOOLEAN DEFAULT 0,
-                    user_approved BOOLEAN DEFAULT 0,
+                    ai_suggested INTEGER DEFAULT 0,
+                    user_approved INTEGER DEFAULT 0,
                     raw_response TEXT,
                     model_name TEXT,
                     prompt_hash TEXT
-                )
+                ){_STRICT}
             """)
 
-            # Migration: Add new columns if they don't exist
-            try:
-                cursor.execute("ALTER TABLE files_log ADD COLUMN raw_response TEXT")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
+            # Migration: Add new columns if they don't exist (once; tracked in user_version)
+            schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version < 1:
+                try:
+                    cursor.execute("ALTER TABLE files_log ADD COLUMN raw_response TEXT")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
 
-            try:
-                cursor.execute("ALTER TABLE files_log ADD COLUMN model_name TEXT")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
+                try:
+                    cursor.execute("ALTER TABLE files_log ADD COLUMN model_name TEXT")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
 
-            try:
-                cursor.execute("ALTER TABLE files_log ADD COLUMN prompt_hash TEXT")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
+                try:
+                    cursor.execute("ALTER TABLE files_log ADD COLUMN prompt_hash TEXT")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+
+                cursor.execute("PRAGMA user_version = 1")
+                schema_version = 1
 
             # Duplicates table
-            cursor.execute("""
+            cursor.execute(f"""
                 CREATE TABLE IF NOT EXISTS duplicates (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     file_hash TEXT NOT NULL,
                     file_path TEXT NOT NULL,
                     file_size INTEGER,
-                    discovered_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    discovered_at TEXT DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(file_hash, file_path)
-                )
+                ){_STRICT}
             """)
 
             # License table
@@ -356,6 +743,17 @@ class DatabaseManager:
                 )
             """)
 
+            # All-time totals of the stats table (single row, id = 1)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stats_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_files INTEGER DEFAULT 0,
+                    total_time REAL DEFAULT 0.0,
+                    total_dups INTEGER DEFAULT 0,
+                    total_ai INTEGER DEFAULT 0
+                )
+            """)
+
             # Deferred queue for age-based moves
             cursor.execute(
                 """
@@ -365,21 +763,132 @@ class DatabaseManager:
                     detected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     eligible_at DATETIME NOT NULL,
                     status TEXT DEFAULT 'queued', -- queued | processing | done | skipped | error
-                    last_error TEXT
+                    last_error TEXT,
+                    eligible_at_epoch INTEGER,
+                    guardian_token TEXT -- file/folder fingerprint the SafetyGuardian approved at enqueue
                 )
                 """
             )
 
+            # Migration: seed stats_totals from the existing per-day stats
+            if schema_version < 2:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO stats_totals (id, total_files, total_time, total_dups, total_ai)
+                    SELECT 1, COALESCE(SUM(files_organised), 0), COALESCE(SUM(time_saved_minutes), 0.0),
+                           COALESCE(SUM(duplicates_removed), 0), COALESCE(SUM(ai_classifications), 0)
+                    FROM stats
+                """)
+                cursor.execute("PRAGMA user_version = 2")
+                schema_version = 2
+
+            # Migration: integer due time for the deferred queue, backfilled from
+            # the local-time eligible_at text
+            if schema_version < 3:
+                try:
+                    cursor.execute("ALTER TABLE deferred_queue ADD COLUMN eligible_at_epoch INTEGER")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+                cursor.execute("""
+                    UPDATE deferred_queue
+                    SET eligible_at_epoch = CAST(strftime('%s', eligible_at, 'utc') AS INTEGER)
+                    WHERE eligible_at_epoch IS NULL
+                """)
+                cursor.execute("DROP INDEX IF EXISTS idx_deferred_due")  # Was on eligible_at
+                cursor.execute("PRAGMA user_version = 3")
+                schema_version = 3
+
+            # Migration: SafetyGuardian verdict fingerprint for deferred items
+            if schema_version < 4:
+                try:
+                    cursor.execute("ALTER TABLE deferred_queue ADD COLUMN guardian_token TEXT")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+                cursor.execute("PRAGMA user_version = 4")
+                schema_version = 4
+
+            # Set while bulk_log_actions writes a batch, which updates the stats
+            # itself; never committed, so other connections always see it empty
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS bulk_log_active (
+                    id INTEGER PRIMARY KEY CHECK (id = 1)
+                )
+            """)
+
+            # Migration: trg_files_log_stats gains its bulk_log_active guard
+            if schema_version < 5:
+                cursor.execute("DROP TRIGGER IF EXISTS trg_files_log_stats")  # Recreated below
+                cursor.execute("PRAGMA user_version = 5")
+                schema_version = 5
+
+            # Migration: idx_files_log_recent leads with timestamp and serves
+            # every lookup the plain timestamp index did
+            if schema_version < 6:
+                cursor.execute("DROP INDEX IF EXISTS idx_files_timestamp")
+                cursor.execute("PRAGMA user_version = 6")
+
             # Create comprehensive indexes for performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_timestamp ON files_log(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_category ON files_log(category)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_operation ON files_log(operation)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_ai_suggested ON files_log(ai_suggested)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_duplicates_hash ON duplicates(file_hash)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_duplicates_path ON duplicates(file_path)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_stats_date ON stats(stat_date)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_deferred_status_eligible ON deferred_queue(status, eligible_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_deferred_eligible ON deferred_queue(eligible_at)")
+            # Partial indexes over the live queue only, so they stay small as the
+            # done/skipped/error history grows: the due-items and next-due queries
+            # range-scan idx_deferred_due, and the startup requeue of interrupted
+            # claims reads idx_deferred_processing
+            cursor.execute("DROP INDEX IF EXISTS idx_deferred_status_eligible")
+            cursor.execute("DROP INDEX IF EXISTS idx_deferred_eligible")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_deferred_due ON deferred_queue(eligible_at_epoch)
+                WHERE status = 'queued'
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_deferred_processing ON deferred_queue(status)
+                WHERE status = 'processing'
+            """)
+
+            # Every logged action counts towards today's stats and the all-time
+            # totals, in the same statement as its insert (bulk_log_actions
+            # aggregates its batch instead)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_files_log_stats AFTER INSERT ON files_log
+                WHEN NOT EXISTS (SELECT 1 FROM bulk_log_active)
+                BEGIN
+                    INSERT INTO stats (stat_date, files_organised, time_saved_minutes, ai_classifications)
+                    VALUES (date('now', 'localtime'), 1, COALESCE(NEW.time_saved, 0.0),
+                            CASE WHEN NEW.ai_suggested THEN 1 ELSE 0 END)
+                    ON CONFLICT(stat_date) DO UPDATE SET
+                        files_organised = files_organised + 1,
+                        time_saved_minutes = time_saved_minutes + excluded.time_saved_minutes,
+                        ai_classifications = ai_classifications + excluded.ai_classifications;
+                    UPDATE stats_totals SET
+                        total_files = total_files + 1,
+                        total_time = total_time + COALESCE(NEW.time_saved, 0.0),
+                        total_ai = total_ai + (CASE WHEN NEW.ai_suggested THEN 1 ELSE 0 END)
+                    WHERE id = 1;
+                END
+            """)
+
+            # Full-text (trigram) index over the searchable path columns
+            self._fts_available = self._create_search_index(cursor)
+
+            # Covering index for get_recent_logs: every selected column is in the
+            # index (id is the rowid), so no table lookups per row. Costs roughly
+            # a second copy of the displayed columns on disk; also serves plain
+            # timestamp ordering and range scans.
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_files_log_recent ON files_log(
+                    timestamp DESC, filename, old_path, new_path, operation, time_saved, category,
+                    ai_suggested, user_approved, model_name
+                )
+            """)
+
+            # Partial index for undo_last_action: only the undoable operations
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_files_undoable ON files_log(timestamp DESC)
+                WHERE operation IN ('move', 'rename')
+            """)
 
             # Composite indexes for common queries
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_timestamp_category ON files_log(timestamp, category)")
@@ -387,6 +896,57 @@ class DatabaseManager:
 
             conn.commit()
 
+    @staticmethod
+    def _create_search_index(cursor: sqlite3.Cursor) -> bool:
+        """
+        Create the files_log_fts index used by search_logs, with triggers that
+        keep it in sync with files_log.
+
+        The trigram tokenizer matches any substring of 3+ characters, the same
+        results as the LIKE '%query%' scan it replaces. Existing rows are
+        indexed once, when the table is first created.
+
+        Returns:
+            bool: False if this SQLite build lacks FTS5 or the trigram tokenizer
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files_log_fts'"
+        ).fetchone()
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS files_log_fts USING fts5(
+                    filename, old_path, new_path,
+                    content='files_log', content_rowid='id', tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_log_fts_insert AFTER INSERT ON files_log BEGIN
+                INSERT INTO files_log_fts(rowid, filename, old_path, new_path)
+                VALUES (new.id, new.filename, new.old_path, new.new_path);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_log_fts_delete AFTER DELETE ON files_log BEGIN
+                INSERT INTO files_log_fts(files_log_fts, rowid, filename, old_path, new_path)
+                VALUES ('delete', old.id, old.filename, old.old_path, old.new_path);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_log_fts_update AFTER UPDATE ON files_log BEGIN
+                INSERT INTO files_log_fts(files_log_fts, rowid, filename, old_path, new_path)
+                VALUES ('delete', old.id, old.filename, old.old_path, old.new_path);
+                INSERT INTO files_log_fts(rowid, filename, old_path, new_path)
+                VALUES (new.id, new.filename, new.old_path, new.new_path);
+            END
+        """)
+
+        if not exists:
+            cursor.execute("INSERT INTO files_log_fts(files_log_fts) VALUES ('rebuild')")
+        return True
+
     # ==================== File Log Operations ====================
 
     def log_action(self, filename: str, old_path: str, new_path: Optional[str],
@@ -416,42 +976,16 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            try:
-                # Start explicit transaction (HIGH #5 FIX)
-                cursor.execute("BEGIN IMMEDIATE")
+            # A single INSERT is atomic on its own (HIGH #5 FIX); the daily and
+            # all-time stats are updated inside it by trg_files_log_stats
+            cursor.execute(_SQL_INSERT_LOG, (
+                filename, old_path, new_path, operation, time_saved, category, ai_suggested, user_approved,
+                raw_response, model_name, prompt_hash))
 
-                # Insert log entry
-                cursor.execute("""
-                    INSERT INTO files_log
-                    (filename, old_path, new_path, operation, time_saved, category, ai_suggested, user_approved,
-                     raw_response, model_name, prompt_hash)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (filename, old_path, new_path, operation, time_saved, category, ai_suggested, user_approved,
-                      raw_response, model_name, prompt_hash))
-
-                log_id = cursor.lastrowid
-                if log_id is None:
-                    raise RuntimeError("Failed to get log ID after insert")
-
-                # Update daily stats
-                today = datetime.now().date()
-                cursor.execute("""
-                    INSERT INTO stats (stat_date, files_organised, time_saved_minutes, ai_classifications)
-                    VALUES (?, 1, ?, ?)
-                    ON CONFLICT(stat_date) DO UPDATE SET
-                        files_organised = files_organised + 1,
-                        time_saved_minutes = time_saved_minutes + ?,
-                        ai_classifications = ai_classifications + ?
-                """, (today, time_saved, 1 if ai_suggested else 0, time_saved, 1 if ai_suggested else 0))
-
-                # Commit transaction (HIGH #5 FIX)
-                conn.commit()
-                return log_id
-
-            except Exception as e:
-                # Rollback on any error (HIGH #5 FIX)
-                conn.rollback()
-                raise e
+            log_id = cursor.lastrowid
+            if log_id is None:
+                raise RuntimeError("Failed to get log ID after insert")
+            return log_id
 
     def get_recent_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -463,17 +997,9 @@ class DatabaseManager:
         Returns:
             List[Dict]: List of log entries as dictionaries
         """
-        sql = self._get_prepared_statement("""
-            SELECT id, filename, old_path, new_path, operation, timestamp, time_saved, category,
-                   ai_suggested, user_approved, model_name
-            FROM files_log
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """)
-
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(sql, (limit,))
+            cursor.execute(_SQL_RECENT_LOGS, (limit,))
             return [dict(row) for row in cursor.fetchall()]
 
     def search_logs(self, query: Optional[str] = None, category: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
@@ -482,6 +1008,7 @@ class DatabaseManager:
 
         Args:
             query (str, optional): Substring to search for in filename/paths
+                (served from files_log_fts when it has 3+ characters)
             category (str, optional): Category to filter by
             limit (int): Max results
 
@@ -494,7 +1021,13 @@ class DatabaseManager:
             where_clauses = []
             params: List[Any] = []
 
-            if query:
+            if query and self._fts_available and len(query) >= 3:
+                # Indexed substring match; the query is passed as one quoted
+                # FTS5 phrase so its characters are never parsed as syntax
+                where_clauses.append("id IN (SELECT rowid FROM files_log_fts WHERE files_log_fts MATCH ?)")
+                params.append('"' + query.replace('"', '""') + '"')
+            elif query:
+                # Too short for trigrams (or no FTS5): scan with LIKE
                 # Escape SQL LIKE wildcards (HIGH #3 FIX)
                 escaped_query = query.replace('%', '\\%').replace('_', '\\_')
                 like = f"%{escaped_query}%"
@@ -518,10 +1051,9 @@ class DatabaseManager:
                 LIMIT ?
             """
 
-            prepared_sql = self._get_prepared_statement(sql)
             params.append(limit)
 
-            cursor.execute(prepared_sql, tuple(params))
+            cursor.execute(sql, tuple(params))
             return [dict(row) for row in cursor.fetchall()]
 
     def undo_last_action(self) -> Optional[Dict[str, Any]]:
@@ -533,12 +1065,7 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM files_log
-                WHERE operation IN ('move', 'rename')
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """)
+            cursor.execute(_SQL_LAST_UNDOABLE)
 
             row = cursor.fetchone()
             return dict(row) if row else None
@@ -575,24 +1102,19 @@ class DatabaseManager:
         Returns:
             List[Dict]: List of duplicate groups, each containing file paths
         """
-        sql = self._get_prepared_statement("""
-            SELECT file_hash, GROUP_CONCAT(file_path, '|') as paths, file_size
-            FROM duplicates
-            GROUP BY file_hash
-            HAVING COUNT(*) > 1
-            ORDER BY file_size DESC
-        """)
-
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(_SQL_DUPLICATE_ROWS)
 
+            # Group the streamed rows here rather than GROUP_CONCAT + split,
+            # which broke on paths containing '|'
             duplicates = []
-            for row in cursor.fetchall():
+            for file_hash, rows in groupby(cursor, key=itemgetter('file_hash')):
+                rows = list(rows)
                 duplicates.append({
-                    'hash': row['file_hash'],
-                    'paths': row['paths'].split('|'),
-                    'size': row['file_size']
+                    'hash': file_hash,
+                    'paths': [row['file_path'] for row in rows],
+                    'size': rows[0]['file_size']
                 })
 
             return duplicates
@@ -626,6 +1148,7 @@ class DatabaseManager:
         Returns:
             bool: True if stored successfully
         """
+        now = datetime.now()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -635,8 +1158,8 @@ class DatabaseManager:
                     expiry_date = ?,
                     status = ?,
                     last_verified = ?
-            """, (license_key, datetime.now(), expiry_date, status, datetime.now(),
-                  expiry_date, status, datetime.now()))
+            """, (license_key, now, expiry_date, status, now,
+                  expiry_date, status, now))
 
             return True
 
@@ -699,46 +1222,7 @@ class DatabaseManager:
         Returns:
             Dict: Statistics including files organised, time saved, etc.
         """
-        # Predefined queries for different periods
-        queries = {
-            'today': self._get_prepared_statement("""
-                SELECT
-                    SUM(files_organised) as total_files,
-                    SUM(time_saved_minutes) as total_time_saved,
-                    SUM(duplicates_removed) as total_duplicates,
-                    SUM(ai_classifications) as total_ai_classifications
-                FROM stats
-                WHERE stat_date = date('now')
-            """),
-            'week': self._get_prepared_statement("""
-                SELECT
-                    SUM(files_organised) as total_files,
-                    SUM(time_saved_minutes) as total_time_saved,
-                    SUM(duplicates_removed) as total_duplicates,
-                    SUM(ai_classifications) as total_ai_classifications
-                FROM stats
-                WHERE stat_date >= date('now', '-7 days')
-            """),
-            'month': self._get_prepared_statement("""
-                SELECT
-                    SUM(files_organised) as total_files,
-                    SUM(time_saved_minutes) as total_time_saved,
-                    SUM(duplicates_removed) as total_duplicates,
-                    SUM(ai_classifications) as total_ai_classifications
-                FROM stats
-                WHERE stat_date >= date('now', '-30 days')
-            """),
-            'all': self._get_prepared_statement("""
-                SELECT
-                    SUM(files_organised) as total_files,
-                    SUM(time_saved_minutes) as total_time_saved,
-                    SUM(duplicates_removed) as total_duplicates,
-                    SUM(ai_classifications) as total_ai_classifications
-                FROM stats
-            """)
-        }
-
-        sql = queries.get(period, queries['all'])
+        sql = _SQL_STATS.get(period, _SQL_STATS['all'])
 
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -764,95 +1248,174 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             today = datetime.now().date()
-            cursor.execute("""
-                INSERT INTO stats (stat_date, duplicates_removed)
-                VALUES (?, ?)
-                ON CONFLICT(stat_date) DO UPDATE SET
-                    duplicates_removed = duplicates_removed + ?
-            """, (today, count, count))
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("""
+                    INSERT INTO stats (stat_date, duplicates_removed)
+                    VALUES (?, ?)
+                    ON CONFLICT(stat_date) DO UPDATE SET
+                        duplicates_removed = duplicates_removed + ?
+                """, (today, count, count))
+                cursor.execute(_SQL_ADD_DUPLICATE_TOTAL, (count,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     # ==================== Deferred Queue Operations ====================
 
-    def enqueue_deferred(self, file_path: str, eligible_at: datetime) -> int:
-        """Add a file to the deferred processing queue."""
+    def enqueue_deferred(self, file_path: str, eligible_at: datetime,
+                         guardian_token: Optional[str] = None) -> int:
+        """
+        Add a file to the deferred processing queue.
+
+        guardian_token is the fingerprint the caller's SafetyGuardian check
+        approved; while it still matches, the sweep skips re-checking.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO deferred_queue (file_path, eligible_at, status)
-                VALUES (?, ?, 'queued')
-                """,
-                (file_path, eligible_at.isoformat())
-            )
+            cursor.execute(_SQL_ENQUEUE_DEFERRED,
+                           (file_path, eligible_at.isoformat(), int(eligible_at.timestamp()), guardian_token))
             item_id = cursor.lastrowid
             if item_id is None:
                 raise RuntimeError("Failed to get item ID after insert")
             return item_id
 
-    def fetch_due_deferred(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Fetch queued items whose eligible_at has passed."""
+    def enqueue_deferred_many(self, items: Iterable[Tuple[str, datetime, Optional[str]]]) -> List[int]:
+        """
+        Add several files to the deferred queue in one transaction.
+
+        Args:
+            items (Iterable[Tuple]): (file_path, eligible_at, guardian_token)
+                per file (see enqueue_deferred)
+
+        Returns:
+            List[int]: Queue item IDs, in input order
+        """
+        rows = [(file_path, eligible_at.isoformat(), int(eligible_at.timestamp()), guardian_token)
+                for file_path, eligible_at, guardian_token in items]
+        if not rows:
+            return []
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id, file_path, detected_at, eligible_at, status
-                FROM deferred_queue
-                WHERE status = 'queued' AND eligible_at <= datetime('now')
-                ORDER BY eligible_at ASC
-                LIMIT ?
-                """,
-                (limit,)
-            )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(_SQL_ENQUEUE_DEFERRED, rows)
+                # The write lock held since BEGIN IMMEDIATE keeps the ids contiguous
+                last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                if not last_id:
+                    raise RuntimeError("Failed to get item ID after batch insert")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+
+        first_id = last_id - len(rows) + 1
+        return list(range(first_id, last_id + 1))
+
+    def fetch_due_deferred(self, limit: int = 100) -> List[sqlite3.Row]:
+        """
+        Claim queued items whose eligible_at has passed.
+
+        The returned items are marked 'processing' in the same transaction,
+        so concurrent sweepers never get the same item. Callers must give
+        each one a final status (or put it back to 'queued'). Rows are
+        returned as-is (read them by column name).
+        """
+        params = (int(time.time()), limit)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                if _HAS_RETURNING:
+                    rows = cursor.execute(_SQL_CLAIM_DUE_DEFERRED, params).fetchall()
+                else:
+                    rows = cursor.execute(_SQL_DUE_DEFERRED, params).fetchall()
+                    cursor.executemany(_SQL_MARK_DEFERRED, [('processing', None, row['id']) for row in rows])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+        if _HAS_RETURNING:
+            # RETURNING rows come back in no particular order; eligible_at is
+            # text whose format depends on who wrote it, so sort on the epoch
+            rows.sort(key=itemgetter('eligible_at_epoch', 'id'))
+        return rows
+
+    def requeue_processing_deferred(self) -> int:
+        """Put items left 'processing' by an interrupted sweep back in the queue."""
+        with self.get_connection() as conn:
+            return conn.execute(_SQL_REQUEUE_PROCESSING).rowcount
+
+    def next_eligible_at(self) -> Optional[datetime]:
+        """Return when the earliest queued item becomes due, or None if the queue is empty."""
+        with self.get_connection() as conn:
+            value = conn.execute(_SQL_NEXT_ELIGIBLE).fetchone()[0]
+        return datetime.fromtimestamp(value) if value is not None else None
 
     def mark_deferred_status(self, item_id: int, status: str, error: str | None = None) -> None:
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE deferred_queue SET status = ?, last_error = ? WHERE id = ?",
-                (status, error, item_id)
-            )
+            cursor.execute(_SQL_MARK_DEFERRED, (status, error, item_id))
+
+    def mark_deferred_status_bulk(self, rows: List[Tuple[str, Optional[str], int]]) -> None:
+        """
+        Update the status of several deferred items in one transaction.
+
+        Args:
+            rows (List[Tuple]): (status, error, item_id) per item
+        """
+        if not rows:
+            return
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(_SQL_MARK_DEFERRED, rows)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     def cleanup(self) -> None:
         """
         Clean up resources and close connection pool.
         Should be called when shutting down the application.
         """
-        if hasattr(self, 'connection_pool'):
-            self.connection_pool.close_all()
-        self._prepared_statements.clear()
+        if hasattr(self, '_finalizer'):
+            self._finalizer()  # Closes the pool once; later calls are no-ops
 
-    def __del__(self):
-        """Destructor to ensure cleanup."""
-        try:
-            self.cleanup()
-        except:
-            pass  # Ignore errors during cleanup
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cleanup()
 
 
 if __name__ == "__main__":
     # Test database operations
-    db = DatabaseManager()
-    print("Database initialized successfully!")
-
-    # Test logging an action
-    log_id = db.log_action(
-        filename="test_file.pdf",
-        old_path="/home/user/Downloads/test_file.pdf",
-        new_path="/home/user/Documents/PDFs/test_file.pdf",
-        operation="move",
-        time_saved=0.5,
-        category="Documents",
-        ai_suggested=True,
-        user_approved=True
-    )
-    print(f"Logged action with ID: {log_id}")
-
-    # Test retrieving stats
-    stats = db.get_stats('today')
-    print(f"Today's stats: {stats}")
-
-    # Test license check
-    is_valid = db.is_license_valid()
-    print(f"License valid: {is_valid}")
+    with DatabaseManager() as db:
+        print("Database initialized successfully!")
+
+        # Test logging an action
+        log_id = db.log_action(
+            filename="test_file.pdf",
+            old_path="/home/user/Downloads/test_file.pdf",
+            new_path="/home/user/Documents/PDFs/test_file.pdf",
+            operation="move",
+            time_saved=0.5,
+            category="Documents",
+            ai_suggested=True,
+            user_approved=True
+        )
+        print(f"Logged action with ID: {log_id}")
+
+        # Test retrieving stats
+        stats = db.get_stats('today')
+        print(f"Today's stats: {stats}")
+
+        # Test license check
+        is_valid = db.is_license_valid()
+        print(f"License valid: {is_valid}")
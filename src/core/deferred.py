@@ -8,11 +8,14 @@ computer normally.
 """
 from __future__ import annotations
 
+import os
+import stat
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, List, Optional, Tuple
 
 from src.config import get_config
 from core.db_manager import DatabaseManager
@@ -21,6 +24,22 @@ from core.actions import ActionManager
 from core.safety_guardian import SafetyGuardian
 
 
+def _stat_or_none(path) -> Optional[os.stat_result]:
+    """One stat call standing in for exists()/is_file()/stat(); None if the path is gone."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _safe_call(fn, *args, **kwargs) -> Tuple[Optional[Any], Optional[str]]:
+    """Call fn and return (result, None), or (None, error message) if it raised."""
+    try:
+        return fn(*args, **kwargs), None
+    except Exception as ex:
+        return None, str(ex)
+
+
 class DeferredService:
     def __init__(self, db: DatabaseManager, cfg=None,
                  poll_seconds: int = 60,
@@ -30,85 +49,184 @@ class DeferredService:
         self.poll_seconds = poll_seconds
         self.enabled = enabled
         self._stop = threading.Event()
+        # Set when something was queued (or on stop) to cut the loop's wait short
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self.guardian = SafetyGuardian(self.cfg)
         self.classifier = FileClassifier(self.cfg, None)
         # Use global dry_run setting for safety; user controls it in config/CLI
         self.actions = ActionManager(self.cfg, self.db, dry_run=self.cfg.dry_run)
+        # Classifies due items in parallel (sized by deferred.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self._worker_count(self.cfg),
+                                            thread_name_prefix="DeferredClassifier")
+
+    @staticmethod
+    def _worker_count(cfg) -> int:
+        """Classifier threads per sweep, from deferred.workers (default 4)."""
+        try:
+            return max(1, int(cfg.get('deferred.workers', 4)))
+        except (AttributeError, TypeError, ValueError):
+            return 4
 
     def start(self):
         if not self.enabled or self._thread is not None:
             return
+        # Items claimed by a sweep that never finished (e.g. the app was killed)
+        self.db.requeue_processing_deferred()
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
 
     def stop(self):
         self._stop.set()
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=5)
             self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Buffered action log rows go out now, not at interpreter exit
+        self.actions.flush_logs()
 
     def schedule_new_file(self, file_path: str, delay_hours: int | float) -> int:
         # Only enqueue if the file exists and is not clearly protected
         p = Path(file_path)
-        if not p.exists() or not p.is_file():
+        st = _stat_or_none(p)
+        if st is None or not stat.S_ISREG(st.st_mode):
             return -1
         safe, _ = self.guardian.is_file_safe_to_modify(p)
         if not safe:
             return -1
         eligible_at = datetime.now() + timedelta(hours=delay_hours)
-        return self.db.enqueue_deferred(str(p), eligible_at)
+        item_id = self.db.enqueue_deferred(str(p), eligible_at, self.guardian.context_fingerprint(p, st))
+        self._wake.set()
+        return item_id
 
     def schedule_existing_file(self, file_path: str, move_if_older_days: int, default_delay_hours: int | float) -> int:
         """For first-run deep scan: if the file is older than N days, enqueue as eligible now; otherwise after delay."""
         p = Path(file_path)
-        if not p.exists() or not p.is_file():
+        plan = self._plan_existing_file(p, datetime.now(), move_if_older_days, default_delay_hours)
+        if plan is None:
             return -1
+        item_id = self.db.enqueue_deferred(str(p), *plan)
+        self._wake.set()
+        return item_id
+
+    def schedule_existing_files(self, file_paths: Iterable[str], move_if_older_days: int,
+                                default_delay_hours: int | float) -> List[int]:
+        """Batch form of schedule_existing_file: every eligible file is enqueued in one transaction.
+
+        Returns the queue IDs of the files that were enqueued.
+        """
+        now = datetime.now()
+        rows = []
+        for file_path in file_paths:
+            p = Path(file_path)
+            plan = self._plan_existing_file(p, now, move_if_older_days, default_delay_hours)
+            if plan is not None:
+                rows.append((str(p), *plan))
+        item_ids = self.db.enqueue_deferred_many(rows)
+        if item_ids:
+            self._wake.set()
+        return item_ids
+
+    def _plan_existing_file(self, p: Path, now: datetime, move_if_older_days: int,
+                            default_delay_hours: int | float) -> Optional[Tuple[datetime, Optional[str]]]:
+        """(eligible_at, guardian token) for an existing file, or None if it must not be queued."""
+        st = _stat_or_none(p)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return None
         safe, _ = self.guardian.is_file_safe_to_modify(p)
         if not safe:
-            return -1
-        try:
-            age_days = max(0, (datetime.now().timestamp() - p.stat().st_mtime) / 86400)
-        except Exception:
-            age_days = 0
+            return None
+        age_days = max(0, (now.timestamp() - st.st_mtime) / 86400)
         if age_days >= move_if_older_days:
-            eligible_at = datetime.now()
-        else:
-            eligible_at = datetime.now() + timedelta(hours=default_delay_hours)
-        return self.db.enqueue_deferred(str(p), eligible_at)
+            return now, self.guardian.context_fingerprint(p, st)
+        return now + timedelta(hours=default_delay_hours), self.guardian.context_fingerprint(p, st)
 
     def _loop(self):
-        while not self._stop.is_set():
-            try:
-                self._sweep_once()
-            except Exception:
-                # Keep the loop resilient; avoid crashing background thread
-                pass
-            finally:
-                self._stop.wait(self.poll_seconds)
+        # The loop's queue reads and writes all reuse one connection, held
+        # for the thread's lifetime and handed back when the loop stops
+        with self.db.dedicated_connection():
+            while not self._stop.is_set():
+                # Cleared before the sweep so an enqueue during it still wakes the next wait
+                self._wake.clear()
+                try:
+                    self._sweep_once()
+                    timeout = self._seconds_until_next_due()
+                except Exception:
+                    # Keep the loop resilient; avoid crashing background thread.
+                    # Back off fully so a failing sweep does not spin on due items
+                    timeout = self.poll_seconds
+                self._wake.wait(timeout)
+
+    def _seconds_until_next_due(self) -> float:
+        """Sleep until the earliest queued item is due, but never longer than poll_seconds."""
+        next_due = self.db.next_eligible_at()
+        if next_due is None:
+            return self.poll_seconds
+        return min(self.poll_seconds, max(0.0, (next_due - datetime.now()).total_seconds()))
 
     def _sweep_once(self):
         due = self.db.fetch_due_deferred(limit=100)
         if not due:
             return
-        for item in due:
-            item_id = item['id']
-            path = Path(item['file_path'])
-            if not path.exists() or not path.is_file():
-                self.db.mark_deferred_status(item_id, 'skipped', error='Missing file')
-                continue
-            safe, reason = self.guardian.is_file_safe_to_modify(path)
-            if not safe:
-                self.db.mark_deferred_status(item_id, 'skipped', error=reason or 'Protected')
-                continue
-            try:
-                # Classify and execute
-                classification = self.classifier.classify(str(path))
-                res = self.actions.execute(str(path), classification, user_approved=True)
-                if res.get('success'):
-                    self.db.mark_deferred_status(item_id, 'done', None)
+        # Claimed items are 'processing'; (status, error, id) per item is
+        # written in one transaction at the end
+        results: List[Tuple[str, Optional[str], int]] = []
+        futures = []
+        try:
+            candidates = []
+            # Stat every due file up front on the executor so slow (HDD,
+            # network) metadata lookups overlap instead of running one by one
+            paths = [item['file_path'] for item in due]  # Plain str throughout; no Path per item
+            stats = self._executor.map(_stat_or_none, paths) if len(paths) > 1 else map(_stat_or_none, paths)
+            for item, path, st in zip(due, paths, stats):
+                item_id = item['id']
+                if st is None or not stat.S_ISREG(st.st_mode):
+                    results.append(('skipped', 'Missing file', item_id))
+                    continue
+                # The guardian approved this file at enqueue; the folder-scanning
+                # layers only run again if anything they read changed since.
+                # The path and file type layers always run.
+                token = item['guardian_token']
+                if token is not None and token == self.guardian.context_fingerprint(path, st):
+                    safe, reason = self.guardian.quick_check(path)
+                else:
+                    safe, reason = self.guardian.is_file_safe_to_modify(path)
+                if not safe:
+                    results.append(('skipped', reason or 'Protected', item_id))
+                    continue
+                candidates.append((item_id, path))
+
+            # Classification is independent per file, so it runs concurrently;
+            # the moves then run as one ActionManager batch in queue order
+            futures = [self._executor.submit(_safe_call, self.classifier.classify, path) for _, path in candidates]
+            classified = []
+            for (item_id, path), future in zip(candidates, futures):
+                if self._stop.is_set():
+                    break
+                classification, err = future.result()
+                if err is not None:
+                    results.append(('error', err, item_id))
                 else:
-                    # Keep queued on cautionary block? Mark error to avoid tight loop
-                    self.db.mark_deferred_status(item_id, 'error', error=res.get('message') or 'Unknown error')
-            except Exception as ex:
-                self.db.mark_deferred_status(item_id, 'error', error=str(ex))
+                    classified.append((item_id, path, classification))
+
+            if classified and not self._stop.is_set():
+                outcomes, err = _safe_call(self.actions.execute_many,
+                                           [(path, classification) for _, path, classification in classified],
+                                           user_approved=True)
+                if err is not None:
+                    outcomes = [{'success': False, 'message': err}] * len(classified)
+                for (item_id, _, _), res in zip(classified, outcomes):
+                    if res.get('success'):
+                        results.append(('done', None, item_id))
+                    else:
+                        # Keep queued on cautionary block? Mark error to avoid tight loop
+                        results.append(('error', res.get('message') or 'Unknown error', item_id))
+        finally:
+            for future in futures:
+                future.cancel()
+            # Record whatever was processed, even if the sweep stopped early,
+            # and release the rest of the claim back to the queue
+            handled = {item_id for _, _, item_id in results}
+            results.extend(('queued', None, item['id']) for item in due if item['id'] not in handled)
+            self.db.mark_deferred_status_bulk(results)
@@ -26,7 +26,7 @@ License: Proprietary (200-key limited release)
 import os
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 from enum import Enum
 import json
 
@@ -314,9 +314,8 @@ class SafetyGuardian:
         if self._custom_protections is not None:
             return self._custom_protections
 
-        config_dir = Path(__file__).parent.parent.parent / 'config'
-        config_dir.mkdir(exist_ok=True)
-        cfg_path = config_dir / 'protected_paths.json'
+        cfg_path = self._protections_file()
+        cfg_path.parent.mkdir(exist_ok=True)
         default = {
             "protected_paths": [],
             "protected_extensions": [],
@@ -348,6 +347,11 @@ class SafetyGuardian:
         }
         return self._custom_protections
 
+    @staticmethod
+    def _protections_file() -> Path:
+        """Location of the user's custom protections (config/protected_paths.json)."""
+        return Path(__file__).parent.parent.parent / 'config' / 'protected_paths.json'
+
     def contains_app_folder_name(self, path: Path) -> Optional[str]:
         """Return matched known application/game folder name if found in path."""
         try:
@@ -476,14 +480,59 @@ class SafetyGuardian:
             return True
         return False
 
-    def is_file_safe_to_modify(self, file_path: Path) -> Tuple[bool, str]:
-        """Master safety check combining all layers for a single file path."""
+    def quick_check(self, file_path: Union[str, Path]) -> Tuple[bool, str]:
+        """Layers 1 and 4 only: path and file type protection, no folder scanning."""
         try:
             p = Path(file_path)
             if self.is_protected_path(p):
                 return False, "Protected system/application path"
             if self.is_protected_file_type(p):
                 return False, "Protected file type (.exe, .dll, game data, etc.)"
+            return True, "Safe to modify"
+        except Exception as e:
+            return False, f"Safety check failed: {e}"
+
+    def context_fingerprint(self, file_path: Union[str, Path],
+                            st: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Fingerprint of everything the folder-scanning layers (3 and 5) read.
+
+        Covers the file itself, the mtime of every folder those layers list
+        (its parent and the ancestors up to the scan depth limit) and the
+        custom protections file. While it is unchanged, a file that passed
+        is_file_safe_to_modify only needs quick_check. Returns None if any
+        part cannot be read.
+        """
+        try:
+            p = Path(file_path)
+            st = st or os.stat(p)
+            parts = [f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"]
+
+            custom = self.load_custom_protections()
+            depth_limit = min(5, max(1, int(custom.get('scan_depth_limit', 3))))
+            cur = p.parent
+            for _ in range(depth_limit + 1):
+                parts.append(str(os.stat(cur).st_mtime_ns))
+                if cur.parent == cur:
+                    break
+                cur = cur.parent
+
+            try:
+                prot = os.stat(self._protections_file())
+                parts.append(f"{prot.st_mtime_ns}:{prot.st_size}")
+            except FileNotFoundError:
+                parts.append("-")
+            return "|".join(parts)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def is_file_safe_to_modify(self, file_path: Union[str, Path]) -> Tuple[bool, str]:
+        """Master safety check combining all layers for a single file path (str or Path)."""
+        try:
+            p = Path(file_path)
+            ok, reason = self.quick_check(p)
+            if not ok:
+                return ok, reason
             if self.is_file_part_of_application(p):
                 return False, "Part of installed application"
             if self.has_application_siblings(p):
@@ -138,7 +138,7 @@ class FileOrganiser:
         self.services = ServiceContainer(self.config)
 
         # Initialize database
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(pragmas=self.config.database_pragmas)
 
         # Initialize license validator
         self.license_validator = LicenseValidator(self.config, self.db)
@@ -407,6 +407,12 @@ class FileOrganiser:
             print("\n\n⏹️  Stopping watcher...")
             if self.watcher:
                 self.watcher.stop()
+            if self.deferred:
+                self.deferred.stop()
+            # Write any buffered action log rows while the pool is still open
+            if getattr(self, 'action_manager', None) and not self.action_manager.flush_logs():
+                print("⚠️  Some action log entries could not be saved (see log)")
+            self.db.cleanup()
             print("Goodbye! 👋")
 
     def scan_existing_files(self):
@@ -423,11 +429,8 @@ class FileOrganiser:
         move_older_days = int(self.config.get('deferred.first_run_move_older_days', 7))
         default_delay = float(self.config.get('deferred.delay_hours', 24))
         if self.deferred and self.deferred.enabled:
-            queued = 0
-            for fp in files:
-                enq_id = self.deferred.schedule_existing_file(fp, move_if_older_days=move_older_days, default_delay_hours=default_delay)
-                if enq_id > 0:
-                    queued += 1
+            queued = len(self.deferred.schedule_existing_files(
+                files, move_if_older_days=move_older_days, default_delay_hours=default_delay))
             print(f"✅ Enqueued {queued} file(s) for deferred organization (older≥{move_older_days}d move sooner)")
         else:
             # Fallback: classify only (no move)
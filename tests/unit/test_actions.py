@@ -11,11 +11,14 @@ from typing import Dict, Any
 from unittest.mock import Mock, MagicMock, patch
 import tempfile
 import shutil
+import threading
+import time
 
 # Import the action manager
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
+from core import actions
 from core.actions import ActionManager
 from config import Config
 
@@ -403,5 +406,170 @@ class TestErrorHandling:
         assert result['action'] == 'none'
 
 
+# A classification that passes input validation
+VALID_CLASSIFICATION = {
+    'category': 'Documents',
+    'suggested_path': 'Documents',
+    'rename': None,
+    'confidence': 'high',
+    'method': 'rule'
+}
+
+
+class TestBatchExecution:
+    """Test execute_many batches."""
+
+    def test_results_in_input_order(self, action_manager, temp_dir, mock_config, mock_db_manager):
+        """Test that each item gets its own result and only successes are logged."""
+        mock_config.base_destination = str(temp_dir / "out")
+        (temp_dir / "a.txt").write_text("a")
+        (temp_dir / "b.txt").write_text("b")
+
+        results = action_manager.execute_many([
+            (str(temp_dir / "a.txt"), VALID_CLASSIFICATION),
+            (str(temp_dir / "missing.txt"), VALID_CLASSIFICATION),
+            (str(temp_dir / "b.txt"), VALID_CLASSIFICATION),
+        ], user_approved=True)
+
+        assert [r['success'] for r in results] == [True, False, True]
+        assert 'not found' in results[1]['message'].lower()
+        assert (temp_dir / "out" / "Documents" / "a.txt").read_text() == "a"
+        assert (temp_dir / "out" / "Documents" / "b.txt").read_text() == "b"
+        # Both successful moves are written in one transaction
+        mock_db_manager.bulk_log_actions.assert_called_once()
+        assert len(mock_db_manager.bulk_log_actions.call_args[0][0]) == 2
+
+    def test_blocked_items_do_not_stop_batch(self, action_manager, temp_dir, mock_config):
+        """Test that an item blocked by validation does not affect the others."""
+        mock_config.base_destination = str(temp_dir / "out")
+        (temp_dir / "a.txt").write_text("a")
+
+        results = action_manager.execute_many([
+            (str(temp_dir / "a.txt"), {'category': 'Documents'}),
+            (str(temp_dir / "a.txt"), VALID_CLASSIFICATION),
+        ], user_approved=True)
+
+        assert results[0]['action'] == 'blocked'
+        assert results[1]['success'] is True
+
+    def test_empty_batch(self, action_manager, mock_db_manager):
+        """Test that an empty batch does nothing."""
+        assert action_manager.execute_many([]) == []
+        mock_db_manager.bulk_log_actions.assert_not_called()
+
+
+class TestLogBuffering:
+    """Test the write-behind action log buffer."""
+
+    def test_execute_buffers_log_until_flush(self, action_manager, temp_dir, mock_config, mock_db_manager):
+        """Test that a single action is logged on flush_logs, not immediately."""
+        mock_config.base_destination = str(temp_dir / "out")
+        (temp_dir / "a.txt").write_text("a")
+
+        result = action_manager.execute(str(temp_dir / "a.txt"), VALID_CLASSIFICATION, user_approved=True)
+
+        assert result['success'] is True
+        mock_db_manager.bulk_log_actions.assert_not_called()
+
+        action_manager.flush_logs()
+
+        mock_db_manager.bulk_log_actions.assert_called_once()
+        assert action_manager._log_timer is None
+        # Nothing is left to write a second time
+        action_manager.flush_logs()
+        mock_db_manager.bulk_log_actions.assert_called_once()
+
+    def test_full_buffer_flushes(self, action_manager, temp_dir, mock_config, mock_db_manager):
+        """Test that the buffer is written as soon as it holds _LOG_FLUSH_ROWS rows."""
+        mock_config.base_destination = str(temp_dir / "out")
+        action_manager._LOG_FLUSH_ROWS = 2
+        for name in ("a.txt", "b.txt"):
+            (temp_dir / name).write_text(name)
+            action_manager.execute(str(temp_dir / name), VALID_CLASSIFICATION, user_approved=True)
+
+        mock_db_manager.bulk_log_actions.assert_called_once()
+        assert len(mock_db_manager.bulk_log_actions.call_args[0][0]) == 2
+
+    def test_timer_flushes_in_background(self, action_manager, temp_dir, mock_config, mock_db_manager):
+        """Test that buffered rows are written by the timer thread without a flush_logs call."""
+        mock_config.base_destination = str(temp_dir / "out")
+        action_manager._LOG_FLUSH_INTERVAL = 0.01
+        flushed_on = []
+        mock_db_manager.bulk_log_actions.side_effect = lambda rows: flushed_on.append(threading.current_thread())
+        (temp_dir / "a.txt").write_text("a")
+
+        action_manager.execute(str(temp_dir / "a.txt"), VALID_CLASSIFICATION, user_approved=True)
+        deadline = time.monotonic() + 5
+        while not flushed_on and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(flushed_on) == 1
+        assert flushed_on[0] is not threading.main_thread()
+
+    def test_failed_flush_keeps_rows(self, action_manager, temp_dir, mock_config, mock_db_manager):
+        """Test that rows from a failed write stay buffered and go out with the next flush."""
+        mock_config.base_destination = str(temp_dir / "out")
+        (temp_dir / "a.txt").write_text("a")
+        action_manager.execute(str(temp_dir / "a.txt"), VALID_CLASSIFICATION, user_approved=True)
+        mock_db_manager.bulk_log_actions.side_effect = Exception("database is locked")
+
+        assert action_manager.flush_logs() is False
+        assert len(action_manager._log_buffer) == 1
+
+        mock_db_manager.bulk_log_actions.side_effect = None
+        (temp_dir / "b.txt").write_text("b")
+        action_manager.execute(str(temp_dir / "b.txt"), VALID_CLASSIFICATION, user_approved=True)
+
+        assert action_manager.flush_logs() is True
+        rows = mock_db_manager.bulk_log_actions.call_args[0][0]
+        assert [row.filename for row in rows] == ["a.txt", "b.txt"]
+        assert action_manager._log_buffer == []
+
+    def test_failed_flush_is_bounded(self, action_manager, mock_db_manager, monkeypatch):
+        """Test that the oldest rows are dropped once the retry buffer is full."""
+        monkeypatch.setattr(actions, '_LOG_BUFFER_LIMIT', 2)
+        mock_db_manager.bulk_log_actions.side_effect = Exception("disk I/O error")
+        action_manager._log_buffer.extend(["r1", "r2", "r3"])
+
+        assert action_manager.flush_logs() is False
+        assert action_manager._log_buffer == ["r2", "r3"]
+        action_manager._log_buffer.clear()
+
+    def test_undo_refuses_when_flush_fails(self, action_manager, mock_db_manager):
+        """Test that undo does not pick an older action while newer rows are unwritten."""
+        action_manager.undo_history.append({'action': 'move'})
+        action_manager._log_buffer.append("row")
+        mock_db_manager.bulk_log_actions.side_effect = Exception("database is locked")
+
+        result = action_manager.undo_last_action()
+
+        assert result['success'] is False
+        mock_db_manager.undo_last_action.assert_not_called()
+        action_manager._log_buffer.clear()
+
+
+class TestFolderPolicyCache:
+    """Test memoized folder policy lookups."""
+
+    def test_policy_cached_per_directory(self, action_manager, mock_config, temp_dir):
+        """Test that files in one folder share a lookup until the config changes."""
+        mock_config.version = 1
+
+        action_manager._folder_policy(str(temp_dir / "a.txt"))
+        action_manager._folder_policy(str(temp_dir / "b.txt"))
+        assert mock_config.get_folder_policy.call_count == 1
+
+        mock_config.version = 2
+        action_manager._folder_policy(str(temp_dir / "a.txt"))
+        assert mock_config.get_folder_policy.call_count == 2
+
+    def test_no_cache_without_version(self, action_manager, mock_config, temp_dir):
+        """Test that configs without a change counter are asked every time."""
+        action_manager._folder_policy(str(temp_dir / "a.txt"))
+        action_manager._folder_policy(str(temp_dir / "a.txt"))
+
+        assert mock_config.get_folder_policy.call_count == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
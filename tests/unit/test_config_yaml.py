@@ -0,0 +1,249 @@
+"""
+Unit tests for the YAML configuration system.
+
+Tests action rule templating and execution, filter compilation and
+loading/saving configuration files.
+"""
+
+import pytest  # type: ignore[import-untyped]
+from pathlib import Path
+from datetime import datetime
+import os
+import tempfile
+import shutil
+import yaml
+
+# Import the YAML config module
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+import config_yaml
+from config_yaml import ActionRule, YAMLConfig, _reserve_unique_path
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for testing."""
+    temp_path = Path(tempfile.mkdtemp())
+    yield temp_path
+    # Cleanup
+    if temp_path.exists():
+        shutil.rmtree(temp_path)
+
+
+class TestTemplateResolution:
+    """Test destination template substitution."""
+
+    def test_known_placeholders(self):
+        """Test that context values are substituted, datetimes as YYYYmmdd_HHMMSS."""
+        rule = ActionRule(name='t', action='move')
+        context = {'name': 'a', 'ext': 'txt', 'created': datetime(2024, 1, 2, 3, 4, 5)}
+
+        resolved = rule._resolve_template("/out/{created}/{name}.{ext}", context)
+
+        assert resolved == "/out/20240102_030405/a.txt"
+
+    def test_unknown_placeholders_left_as_is(self):
+        """Test that placeholders missing from the context are kept."""
+        rule = ActionRule(name='t', action='move')
+
+        assert rule._resolve_template("/out/{name}/{missing}", {'name': 'a'}) == "/out/a/{missing}"
+
+    def test_other_braces_left_as_is(self):
+        """Test that escaped braces, format specs and stray braces are not interpreted."""
+        rule = ActionRule(name='t', action='move')
+
+        resolved = rule._resolve_template("/out/{{x}}/{name:>3}/{name}/{", {'name': 'a'})
+
+        assert resolved == "/out/{{x}}/{name:>3}/a/{"
+
+    def test_empty_template(self):
+        """Test that an empty template resolves to None."""
+        rule = ActionRule(name='t', action='move')
+        assert rule._resolve_template(None, {}) is None
+
+
+class TestRegexCompilation:
+    """Test regex filter compilation."""
+
+    def test_patterns_are_merged(self):
+        """Test that a pattern list becomes one alternation."""
+        compiled = YAMLConfig._compile_regex_list([r'\.tmp$', r'^~'])
+
+        assert len(compiled) == 1
+        assert compiled[0].search('file.tmp')
+        assert compiled[0].search('~lock')
+        assert not compiled[0].search('notes.txt')
+
+    def test_backreferences_are_not_merged(self):
+        """Test that patterns with groups keep their own numbering."""
+        compiled = YAMLConfig._compile_regex_list([r'(ab)\1', r'x'])
+
+        assert len(compiled) == 2
+        assert compiled[0].search('abab')
+        assert not any(p.search('ab') for p in compiled)
+
+    def test_inline_flags_are_not_merged(self):
+        """Test that a merge the regex engine rejects falls back to separate patterns."""
+        compiled = YAMLConfig._compile_regex_list([r'(?i)readme', r'x'])
+
+        assert len(compiled) == 2
+        assert compiled[0].search('README.md')
+
+    def test_single_pattern(self):
+        """Test that a single pattern is compiled as-is."""
+        compiled = YAMLConfig._compile_regex_list(['x'])
+        assert [p.pattern for p in compiled] == ['x']
+
+
+class TestConflictRename:
+    """Test no-clobber destination naming."""
+
+    def test_reserve_free_name(self, temp_dir):
+        """Test that a free name is reserved as-is."""
+        target = temp_dir / "photo.jpg"
+
+        reserved = _reserve_unique_path(target)
+
+        assert reserved == target
+        assert reserved.exists()
+
+    def test_reserve_adds_suffix(self, temp_dir):
+        """Test that taken names get _1, _2, ... suffixes."""
+        (temp_dir / "photo.jpg").write_text("first")
+        (temp_dir / "photo_1.jpg").write_text("second")
+
+        reserved = _reserve_unique_path(temp_dir / "photo.jpg")
+
+        assert reserved == temp_dir / "photo_2.jpg"
+        assert (temp_dir / "photo.jpg").read_text() == "first"
+        assert (temp_dir / "photo_1.jpg").read_text() == "second"
+
+    def test_move_does_not_clobber(self, temp_dir):
+        """Test that a move onto an existing file is renamed instead."""
+        existing = temp_dir / "dest" / "notes.txt"
+        existing.parent.mkdir()
+        existing.write_text("old")
+        source = temp_dir / "notes.txt"
+        source.write_text("new")
+        rule = ActionRule(name='move', action='move', destination=str(existing))
+
+        result = rule.execute(source, {})
+
+        assert result['success'] is True
+        assert result['to'] == str(temp_dir / "dest" / "notes_1.txt")
+        assert existing.read_text() == "old"
+        assert (temp_dir / "dest" / "notes_1.txt").read_text() == "new"
+        assert not source.exists()
+
+    def test_failed_move_releases_reservation(self, temp_dir):
+        """Test that the placeholder is removed when the move fails."""
+        rule = ActionRule(name='move', action='move', destination=str(temp_dir / "dest" / "gone.txt"))
+
+        result = rule.execute(temp_dir / "gone.txt", {})
+
+        assert result['success'] is False
+        assert not (temp_dir / "dest" / "gone.txt").exists()
+
+
+class TestCopyAction:
+    """Test the copy action."""
+
+    def test_copy_to_new_destination(self, temp_dir):
+        """Test copying a file to a new path, keeping its contents and mtime."""
+        source = temp_dir / "report.txt"
+        source.write_bytes(b"quarterly numbers" * 10000)
+        os.utime(source, (1_600_000_000, 1_600_000_000))
+        dest = temp_dir / "backup" / "report.txt"
+        rule = ActionRule(name='backup', action='copy', destination=str(dest))
+
+        result = rule.execute(source, {})
+
+        assert result['success'] is True
+        assert result['to'] == str(dest)
+        assert dest.read_bytes() == source.read_bytes()
+        assert dest.stat().st_mtime == 1_600_000_000
+
+    def test_copy_into_existing_directory(self, temp_dir):
+        """Test that a directory destination receives a file of the same name."""
+        source = temp_dir / "report.txt"
+        source.write_text("quarterly numbers")
+        backup = temp_dir / "backup"
+        backup.mkdir()
+        rule = ActionRule(name='backup', action='copy', destination=str(backup))
+
+        result = rule.execute(source, {})
+
+        assert result['success'] is True
+        assert result['to'] == str(backup / "report.txt")
+        assert (backup / "report.txt").read_text() == "quarterly numbers"
+
+    def test_copy_onto_itself_keeps_source(self, temp_dir):
+        """Test that copying a file onto itself fails without truncating it."""
+        source = temp_dir / "report.txt"
+        source.write_text("quarterly numbers")
+        rule = ActionRule(name='self', action='copy', destination=str(source))
+
+        result = rule.execute(source, {})
+
+        assert result['success'] is False
+        assert source.read_text() == "quarterly numbers"
+
+    def test_copy_onto_hard_link_keeps_source(self, temp_dir):
+        """Test that a destination that is another name for the source is left alone."""
+        source = temp_dir / "report.txt"
+        source.write_text("quarterly numbers")
+        os.link(source, temp_dir / "alias.txt")
+        rule = ActionRule(name='alias', action='copy', destination=str(temp_dir / "alias.txt"))
+
+        result = rule.execute(source, {})
+
+        assert result['success'] is False
+        assert source.read_text() == "quarterly numbers"
+
+
+class TestYAMLLoading:
+    """Test loading and saving configuration files."""
+
+    @pytest.fixture
+    def config_file(self, temp_dir):
+        config_file = temp_dir / "config.yaml"
+        config_file.write_text(yaml.dump({
+            'version': '1.0',
+            'settings': {'base_destination': str(temp_dir)},
+            'filters': {'docs': {'extensions': ['.pdf']}},
+            'extra': {'keep': [1, 2, 3]},
+        }))
+        return config_file
+
+    def test_small_config_is_loaded_fully(self, config_file):
+        """Test that configs under the threshold are parsed with safe_load."""
+        config = YAMLConfig(str(config_file))
+
+        assert config.get('extra.keep') == [1, 2, 3]
+
+    def test_streaming_load_and_save_keep_other_sections(self, config_file, temp_dir, monkeypatch):
+        """Test that sections skipped by the streaming loader survive a save."""
+        monkeypatch.setattr(config_yaml, '_STREAM_PARSE_THRESHOLD', 0)
+
+        config = YAMLConfig(str(config_file))
+
+        assert config.get('settings.base_destination') == str(temp_dir)
+        assert config.get('extra') is None
+
+        config.add_filter('images', {'extensions': ['.png']})
+        saved = yaml.safe_load(config_file.read_text())
+
+        assert saved['extra'] == {'keep': [1, 2, 3]}
+        assert saved['version'] == '1.0'
+        assert set(saved['filters']) == {'docs', 'images'}
+
+    def test_streaming_load_of_non_mapping_falls_back(self, temp_dir, monkeypatch):
+        """Test that documents the event walker cannot handle are loaded fully."""
+        monkeypatch.setattr(config_yaml, '_STREAM_PARSE_THRESHOLD', 0)
+        config_file = temp_dir / "config.yaml"
+        config_file.write_text("base: &base {base_destination: /srv}\nsettings: *base\n")
+
+        config = YAMLConfig(str(config_file))
+
+        assert config.get('settings.base_destination') == '/srv'
@@ -0,0 +1,483 @@
+"""
+Unit tests for DatabaseManager.
+
+Tests the connection pool, schema migrations, action log search and
+statistics, duplicate tracking and the deferred queue.
+"""
+
+import pytest  # type: ignore[import-untyped]
+from pathlib import Path
+from datetime import datetime, timedelta
+import queue
+import sqlite3
+import tempfile
+import shutil
+import threading
+
+# Import the database manager
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core import db_manager
+from core.db_manager import ConnectionPool, DatabaseManager
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for testing."""
+    temp_path = Path(tempfile.mkdtemp())
+    yield temp_path
+    # Cleanup
+    if temp_path.exists():
+        shutil.rmtree(temp_path)
+
+
+@pytest.fixture
+def db(temp_dir):
+    """Create a DatabaseManager on a fresh database file."""
+    manager = DatabaseManager(str(temp_dir / "test.db"))
+    yield manager
+    manager.cleanup()
+
+
+class TestConnectionPool:
+    """Test the SQLite connection pool."""
+
+    def test_connection_usable_from_another_thread(self, temp_dir):
+        """Test that a pooled connection can be handed to a different thread."""
+        pool = ConnectionPool(str(temp_dir / "test.db"), max_connections=1)
+        conn = pool._create_connection()
+        errors = []
+
+        def use_connection():
+            try:
+                conn.execute("CREATE TABLE t (x INTEGER)")
+                conn.execute("INSERT INTO t VALUES (1)")
+            except sqlite3.Error as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=use_connection)
+        worker.start()
+        worker.join()
+
+        assert errors == []
+        assert conn.execute("SELECT x FROM t").fetchall()[0][0] == 1
+        conn.close()
+
+    def test_connections_opened_on_demand(self, temp_dir):
+        """Test that no connection is opened until one is requested."""
+        pool = ConnectionPool(str(temp_dir / "test.db"), max_connections=2)
+        assert pool._active_connections == 0
+
+        conn = pool.get_connection()
+        pool.return_connection(conn)
+
+        # The idle connection is reused rather than opening another
+        assert pool.get_connection() is conn
+        assert pool._active_connections == 1
+        pool.return_connection(conn)
+        pool.close_all()
+
+    def test_exhausted_pool_waits_then_fails(self, temp_dir):
+        """Test that callers beyond max_connections time out."""
+        pool = ConnectionPool(str(temp_dir / "test.db"), max_connections=1, timeout=0.05)
+        conn = pool.get_connection()
+
+        with pytest.raises(queue.Empty):
+            pool.get_connection()
+
+        pool.return_connection(conn)
+        pool.close_all()
+
+
+class TestDuplicates:
+    """Test duplicate group reporting."""
+
+    def test_groups_by_hash(self, db):
+        """Test that each hash with more than one path is reported once, largest first."""
+        db.add_duplicate('h1', '/a', 10)
+        db.add_duplicate('h2', '/c', 7)
+        db.add_duplicate('h1', '/b', 10)
+        db.add_duplicate('h2', '/d', 7)
+        db.add_duplicate('unique', '/e', 99)
+
+        groups = db.get_duplicates()
+
+        assert [g['hash'] for g in groups] == ['h1', 'h2']
+        assert sorted(groups[0]['paths']) == ['/a', '/b']
+        assert groups[0]['size'] == 10
+
+    def test_same_hash_with_different_sizes(self, db):
+        """Test that a hash recorded with differing sizes is still one group."""
+        db.add_duplicate('h1', '/a', 10)
+        db.add_duplicate('h2', '/c', 7)
+        db.add_duplicate('h1', '/b', 5)
+        db.add_duplicate('h2', '/d', 7)
+
+        groups = db.get_duplicates()
+
+        assert [g['hash'] for g in groups] == ['h1', 'h2']
+        assert sorted(groups[0]['paths']) == ['/a', '/b']
+        assert groups[0]['size'] == 10
+
+    def test_paths_with_separator(self, db):
+        """Test that paths containing '|' are not split."""
+        db.add_duplicate('h', '/a|b', 1)
+        db.add_duplicate('h', '/c', 1)
+
+        assert sorted(db.get_duplicates()[0]['paths']) == ['/a|b', '/c']
+
+
+def _create_unversioned_database(db_file):
+    """Create a database with the tables as they were before user_version was tracked."""
+    conn = sqlite3.connect(str(db_file))
+    conn.executescript("""
+        CREATE TABLE files_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            old_path TEXT NOT NULL,
+            new_path TEXT,
+            operation TEXT NOT NULL,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            time_saved REAL DEFAULT 0.0,
+            category TEXT,
+            ai_suggested INTEGER DEFAULT 0,
+            user_approved INTEGER DEFAULT 0
+        );
+        CREATE TABLE stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stat_date DATE UNIQUE NOT NULL,
+            files_organised INTEGER DEFAULT 0,
+            time_saved_minutes REAL DEFAULT 0.0,
+            duplicates_removed INTEGER DEFAULT 0,
+            ai_classifications INTEGER DEFAULT 0
+        );
+        CREATE TABLE deferred_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT NOT NULL,
+            detected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            eligible_at DATETIME NOT NULL,
+            status TEXT DEFAULT 'queued',
+            last_error TEXT
+        );
+        CREATE INDEX idx_deferred_due ON deferred_queue(eligible_at);
+        INSERT INTO files_log (filename, old_path, operation) VALUES ('a.txt', '/in/a.txt', 'move');
+        INSERT INTO stats (stat_date, files_organised, time_saved_minutes) VALUES ('2024-01-01', 3, 1.5);
+        INSERT INTO stats (stat_date, files_organised, time_saved_minutes) VALUES ('2024-01-02', 2, 0.5);
+        INSERT INTO deferred_queue (file_path, eligible_at) VALUES ('/tmp/old.txt', '2024-01-02 03:04:05');
+    """)
+    conn.commit()
+    conn.close()
+
+
+class TestMigrations:
+    """Test user_version schema migrations."""
+
+    SCHEMA_VERSION = 6
+
+    def test_fresh_database_is_current(self, db):
+        """Test that a new database starts at the latest schema version."""
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == self.SCHEMA_VERSION
+
+    def test_upgrade_from_unversioned_schema(self, temp_dir):
+        """Test migrating a database created before user_version was tracked."""
+        db_file = temp_dir / "old.db"
+        _create_unversioned_database(db_file)
+
+        manager = DatabaseManager(str(db_file))
+        try:
+            with manager.get_connection() as conn:
+                assert conn.execute("PRAGMA user_version").fetchone()[0] == self.SCHEMA_VERSION
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(files_log)")}
+                assert {'raw_response', 'model_name', 'prompt_hash'} <= columns
+                assert conn.execute("SELECT filename FROM files_log").fetchone()[0] == 'a.txt'
+                # All-time totals are seeded from the per-day stats
+                totals = conn.execute("SELECT total_files, total_time FROM stats_totals").fetchone()
+                assert tuple(totals) == (5, 2.0)
+                # The integer due time is backfilled from the local-time eligible_at text
+                epoch = conn.execute("SELECT eligible_at_epoch FROM deferred_queue").fetchone()[0]
+                assert epoch == int(datetime(2024, 1, 2, 3, 4, 5).timestamp())
+                # Items queued before guardian tokens existed get the full re-check
+                assert conn.execute("SELECT guardian_token FROM deferred_queue").fetchone()[0] is None
+                index_sql = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'idx_deferred_due'"
+                ).fetchone()
+                assert index_sql is None or 'eligible_at_epoch' in index_sql[0]
+        finally:
+            manager.cleanup()
+
+    def test_reopen_is_idempotent(self, temp_dir):
+        """Test that opening a migrated database again changes nothing."""
+        db_file = temp_dir / "old.db"
+        _create_unversioned_database(db_file)
+        DatabaseManager(str(db_file)).cleanup()
+
+        manager = DatabaseManager(str(db_file))
+        try:
+            with manager.get_connection() as conn:
+                assert conn.execute("PRAGMA user_version").fetchone()[0] == self.SCHEMA_VERSION
+                assert conn.execute("SELECT COUNT(*) FROM files_log").fetchone()[0] == 1
+                assert conn.execute("SELECT total_files FROM stats_totals").fetchone()[0] == 5
+        finally:
+            manager.cleanup()
+
+    def test_stats_trigger_gets_bulk_guard(self, temp_dir):
+        """Test that a stats trigger from before the bulk guard is replaced."""
+        db_file = temp_dir / "old.db"
+        DatabaseManager(str(db_file)).cleanup()
+        conn = sqlite3.connect(db_file)
+        conn.executescript("""
+            DROP TRIGGER trg_files_log_stats;
+            CREATE TRIGGER trg_files_log_stats AFTER INSERT ON files_log BEGIN
+                UPDATE stats_totals SET total_files = total_files + 1 WHERE id = 1;
+            END;
+            PRAGMA user_version = 4;
+        """)
+        conn.close()
+
+        manager = DatabaseManager(str(db_file))
+        try:
+            with manager.get_connection() as conn:
+                trigger_sql = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'trg_files_log_stats'"
+                ).fetchone()[0]
+                assert 'bulk_log_active' in trigger_sql
+        finally:
+            manager.cleanup()
+
+    def test_redundant_timestamp_index_dropped(self, temp_dir):
+        """Test that idx_files_timestamp is removed in favour of idx_files_log_recent."""
+        db_file = temp_dir / "old.db"
+        DatabaseManager(str(db_file)).cleanup()
+        conn = sqlite3.connect(db_file)
+        conn.executescript("""
+            CREATE INDEX idx_files_timestamp ON files_log(timestamp);
+            PRAGMA user_version = 5;
+        """)
+        conn.close()
+
+        manager = DatabaseManager(str(db_file))
+        try:
+            with manager.get_connection() as conn:
+                indexes = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'files_log'"
+                )}
+                assert 'idx_files_timestamp' not in indexes
+                assert 'idx_files_log_recent' in indexes
+                plan = conn.execute("EXPLAIN QUERY PLAN " + db_manager._SQL_RECENT_LOGS, (50,)).fetchall()
+                assert any('COVERING INDEX idx_files_log_recent' in row[-1] for row in plan)
+        finally:
+            manager.cleanup()
+
+
+class TestStats:
+    """Test statistics kept alongside the action log."""
+
+    def test_totals_follow_logged_actions(self, db):
+        """Test that the all-time totals include newly logged actions."""
+        db.log_action('a.txt', '/in/a.txt', '/out/a.txt', 'move', 0.5, 'Documents', True, True)
+        db.log_action('b.txt', '/in/b.txt', '/out/b.txt', 'move', 0.25, 'Documents', False, True)
+
+        stats = db.get_stats('all')
+
+        assert stats['files_organised'] == 2
+        assert stats['time_saved_minutes'] == pytest.approx(0.75)
+
+    def test_bulk_and_single_logs_counted_once(self, db):
+        """Test that bulk batches are counted once, by their aggregate upsert."""
+        db.log_action('a.txt', '/in/a.txt', '/out/a.txt', 'move', 0.5, 'Documents', True, True)
+        db.bulk_log_actions([
+            db_manager.LogAction('b.txt', '/in/b.txt', '/out/b.txt', 'move', 0.25, ai_suggested=True),
+            db_manager.LogAction('c.txt', '/in/c.txt', '/out/c.txt', 'move', 0.25),
+        ])
+        db.log_action('d.txt', '/in/d.txt', '/out/d.txt', 'move', 1.0)
+
+        for period in ('today', 'all'):
+            stats = db.get_stats(period)
+            assert stats['files_organised'] == 4
+            assert stats['time_saved_minutes'] == pytest.approx(2.0)
+            assert stats['ai_classifications'] == 2
+        with db.get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM bulk_log_active").fetchone()[0] == 0
+
+    def test_failed_bulk_log_leaves_trigger_on(self, db):
+        """Test that a rolled back batch does not leave the per-row stats switched off."""
+        with pytest.raises(Exception):
+            db.bulk_log_actions([db_manager.LogAction(None, '/in/a.txt', None, 'move')])
+
+        db.log_action('b.txt', '/in/b.txt', '/out/b.txt', 'move', 0.5)
+
+        assert db.get_stats('all')['files_organised'] == 1
+
+
+class TestLogSearch:
+    """Test searching the action log."""
+
+    @pytest.fixture
+    def logged_db(self, db):
+        db.log_action('report.pdf', '/in/report.pdf', '/docs/report.pdf', 'move', 0.5, 'Documents', True, True)
+        db.log_action('ab.txt', '/in/ab.txt', '/misc/ab.txt', 'move', 0.5, 'Misc', False, True)
+        db.log_action('100%_done.txt', '/in/100%_done.txt', None, 'rename', 0.3, 'Misc', False, True)
+        return db
+
+    def test_fts_search(self, logged_db):
+        """Test substring search served from the trigram index."""
+        if not logged_db._fts_available:
+            pytest.skip("SQLite build lacks FTS5 trigram support")
+        assert [r['filename'] for r in logged_db.search_logs('port')] == ['report.pdf']
+        # Matches in the paths count too, and FTS5 syntax is taken literally
+        assert [r['filename'] for r in logged_db.search_logs('/docs/')] == ['report.pdf']
+        assert logged_db.search_logs('"OR"') == []
+
+    def test_fts_index_follows_deletes(self, logged_db):
+        """Test that removed log rows no longer match."""
+        if not logged_db._fts_available:
+            pytest.skip("SQLite build lacks FTS5 trigram support")
+        with logged_db.get_connection() as conn:
+            conn.execute("DELETE FROM files_log WHERE filename = 'report.pdf'")
+
+        assert logged_db.search_logs('report') == []
+
+    def test_like_fallback(self, logged_db):
+        """Test that short queries and builds without FTS5 use LIKE."""
+        assert [r['filename'] for r in logged_db.search_logs('ab')] == ['ab.txt']
+
+        logged_db._fts_available = False
+        assert [r['filename'] for r in logged_db.search_logs('port')] == ['report.pdf']
+        # LIKE wildcards in the query are matched literally
+        assert [r['filename'] for r in logged_db.search_logs('0%_')] == ['100%_done.txt']
+
+    def test_category_filter(self, logged_db):
+        """Test filtering by category."""
+        results = logged_db.search_logs(category='Misc')
+        assert sorted(r['filename'] for r in results) == ['100%_done.txt', 'ab.txt']
+
+
+class TestDeferredQueue:
+    """Test the deferred processing queue."""
+
+    def test_fetch_only_due_items(self, db):
+        """Test that items are returned once their eligible_at has passed."""
+        now = datetime.now()
+        db.enqueue_deferred('/due', now - timedelta(minutes=5))
+        db.enqueue_deferred('/later', now + timedelta(hours=1))
+
+        assert [row['file_path'] for row in db.fetch_due_deferred()] == ['/due']
+
+    @staticmethod
+    def _statuses(db):
+        with db.get_connection() as conn:
+            return {row['file_path']: row['status']
+                    for row in conn.execute("SELECT file_path, status FROM deferred_queue")}
+
+    def test_claim_in_due_order(self, db):
+        """Test that due items are claimed earliest first and handed out only once."""
+        now = datetime.now()
+        db.enqueue_deferred('/b', now - timedelta(seconds=5))
+        db.enqueue_deferred('/a', now - timedelta(minutes=5))
+        db.enqueue_deferred('/later', now + timedelta(hours=1))
+
+        rows = db.fetch_due_deferred()
+
+        assert [row['file_path'] for row in rows] == ['/a', '/b']
+        assert self._statuses(db) == {'/a': 'processing', '/b': 'processing', '/later': 'queued'}
+        assert db.fetch_due_deferred() == []
+
+    def test_claim_returns_guardian_token(self, db):
+        """Test that the token stored at enqueue comes back with the claimed item."""
+        db.enqueue_deferred('/a', datetime.now() - timedelta(seconds=1), guardian_token='token')
+        db.enqueue_deferred('/b', datetime.now() - timedelta(seconds=1))
+
+        tokens = {row['file_path']: row['guardian_token'] for row in db.fetch_due_deferred()}
+
+        assert tokens == {'/a': 'token', '/b': None}
+
+    def test_claim_without_returning(self, db, monkeypatch):
+        """Test the SELECT + UPDATE path used on SQLite builds without RETURNING."""
+        monkeypatch.setattr(db_manager, '_HAS_RETURNING', False)
+        now = datetime.now()
+        db.enqueue_deferred('/b', now - timedelta(seconds=5))
+        db.enqueue_deferred('/a', now - timedelta(minutes=5))
+
+        rows = db.fetch_due_deferred()
+
+        assert [row['file_path'] for row in rows] == ['/a', '/b']
+        assert self._statuses(db) == {'/a': 'processing', '/b': 'processing'}
+        assert db.fetch_due_deferred() == []
+
+    def test_claim_breaks_ties_by_id(self, db):
+        """Test that items due at the same second are claimed in queue order."""
+        eligible_at = datetime.now() - timedelta(minutes=1)
+        for name in ('/c', '/a', '/b'):
+            db.enqueue_deferred(name, eligible_at)
+
+        rows = db.fetch_due_deferred()
+
+        assert [row['file_path'] for row in rows] == ['/c', '/a', '/b']
+        assert len({row['eligible_at_epoch'] for row in rows}) == 1
+
+    def test_claim_breaks_ties_by_id_without_returning(self, db, monkeypatch):
+        """Test the same order on the SELECT + UPDATE path."""
+        monkeypatch.setattr(db_manager, '_HAS_RETURNING', False)
+        eligible_at = datetime.now() - timedelta(minutes=1)
+        for name in ('/c', '/a', '/b'):
+            db.enqueue_deferred(name, eligible_at)
+
+        assert [row['file_path'] for row in db.fetch_due_deferred()] == ['/c', '/a', '/b']
+
+    def test_claim_respects_limit(self, db):
+        """Test that at most limit items are claimed, the rest stay queued."""
+        now = datetime.now()
+        for n in range(3):
+            db.enqueue_deferred(f'/{n}', now - timedelta(minutes=n))
+
+        assert [row['file_path'] for row in db.fetch_due_deferred(limit=2)] == ['/2', '/1']
+        assert self._statuses(db)['/0'] == 'queued'
+
+    def test_requeue_interrupted_claims(self, db):
+        """Test that items left 'processing' go back in the queue."""
+        db.enqueue_deferred('/a', datetime.now() - timedelta(seconds=1))
+        claimed = db.fetch_due_deferred()
+
+        assert db.requeue_processing_deferred() == 1
+        assert [row['id'] for row in db.fetch_due_deferred()] == [claimed[0]['id']]
+
+    def test_final_status_is_not_requeued(self, db):
+        """Test that finished items stay out of the queue."""
+        db.enqueue_deferred('/a', datetime.now() - timedelta(seconds=1))
+        row = db.fetch_due_deferred()[0]
+
+        db.mark_deferred_status_bulk([('done', None, row['id'])])
+
+        assert db.requeue_processing_deferred() == 0
+        assert self._statuses(db) == {'/a': 'done'}
+
+    def test_next_eligible_at(self, db):
+        """Test that the earliest queued due time is reported."""
+        eligible_at = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        db.enqueue_deferred('/a', eligible_at + timedelta(hours=1))
+        db.enqueue_deferred('/b', eligible_at)
+
+        assert db.next_eligible_at() == eligible_at
+
+    def test_next_eligible_at_ignores_finished_items(self, db):
+        """Test that items with a final status are not waited for."""
+        assert db.next_eligible_at() is None
+        item_id = db.enqueue_deferred('/a', datetime.now() + timedelta(hours=1))
+
+        db.mark_deferred_status_bulk([('done', None, item_id)])
+
+        assert db.next_eligible_at() is None
+
+
+    def test_migrated_items_are_due(self, temp_dir):
+        """Test that backfilled items are claimed once their time has passed."""
+        db_file = temp_dir / "old.db"
+        _create_unversioned_database(db_file)
+
+        manager = DatabaseManager(str(db_file))
+        try:
+            assert [row['file_path'] for row in manager.fetch_due_deferred()] == ['/tmp/old.txt']
+        finally:
+            manager.cleanup()
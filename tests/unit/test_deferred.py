@@ -0,0 +1,303 @@
+"""
+Unit tests for the deferred processing service.
+
+Tests scheduling and waking the background loop, the sweep over due
+items and the SafetyGuardian re-check before moving them.
+"""
+
+import pytest  # type: ignore[import-untyped]
+from pathlib import Path
+from datetime import datetime, timedelta
+from unittest.mock import Mock, MagicMock, patch
+import os
+import tempfile
+import shutil
+import time
+
+# Import the deferred service (it imports the config as src.config)
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from core.deferred import DeferredService
+from core.db_manager import DatabaseManager
+from core.safety_guardian import SafetyGuardian
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for testing."""
+    temp_path = Path(tempfile.mkdtemp())
+    yield temp_path
+    # Cleanup
+    if temp_path.exists():
+        shutil.rmtree(temp_path)
+
+
+@pytest.fixture
+def db(temp_dir):
+    """Create a DatabaseManager on a fresh database file."""
+    manager = DatabaseManager(str(temp_dir / "test.db"))
+    yield manager
+    manager.cleanup()
+
+
+@pytest.fixture
+def mock_guardian():
+    """Create a mock Safety Guardian that approves everything."""
+    guardian = MagicMock()
+    guardian.context_fingerprint.return_value = 'token'
+    guardian.quick_check.return_value = (True, 'Safe to modify')
+    guardian.is_file_safe_to_modify.return_value = (True, 'Safe to modify')
+    return guardian
+
+
+def _make_service(db, guardian, **kwargs):
+    """Build a DeferredService with mocked guardian, classifier and actions."""
+    config = Mock()
+    config.get.return_value = 2
+    config.dry_run = False
+    with patch('core.deferred.SafetyGuardian', return_value=guardian), \
+            patch('core.deferred.FileClassifier'), \
+            patch('core.deferred.ActionManager'):
+        svc = DeferredService(db, cfg=config, **kwargs)
+    svc.classifier.classify.return_value = {'category': 'Documents'}
+    svc.actions.execute.return_value = {'success': True}
+    svc.actions.execute_many.side_effect = lambda items, user_approved: [{'success': True}] * len(items)
+    return svc
+
+
+@pytest.fixture
+def service(db, mock_guardian):
+    """Create a DeferredService that is not started."""
+    svc = _make_service(db, mock_guardian, enabled=False)
+    yield svc
+    svc.stop()
+
+
+def _statuses(db):
+    with db.get_connection() as conn:
+        return {row['file_path']: row['status'] for row in conn.execute("SELECT file_path, status FROM deferred_queue")}
+
+
+class TestScheduling:
+    """Test queueing files and waking the loop."""
+
+    def test_schedule_wakes_loop(self, service, temp_dir):
+        """Test that queueing a file wakes the loop's wait."""
+        target = temp_dir / "new.txt"
+        target.write_text("x")
+
+        item_id = service.schedule_new_file(str(target), 1)
+
+        assert item_id > 0
+        assert service._wake.is_set()
+
+    def test_schedule_skips_missing_file(self, service, temp_dir):
+        """Test that files that do not exist are not queued."""
+        assert service.schedule_new_file(str(temp_dir / "gone.txt"), 1) == -1
+        assert not service._wake.is_set()
+
+    def test_wait_until_next_due(self, service, db):
+        """Test that the loop sleeps until the next item, capped at poll_seconds."""
+        service.poll_seconds = 60
+        assert service._seconds_until_next_due() == 60
+
+        db.enqueue_deferred('/later', datetime.now() + timedelta(hours=1))
+        assert service._seconds_until_next_due() == 60
+
+        db.enqueue_deferred('/soon', datetime.now() + timedelta(seconds=10))
+        assert 0 < service._seconds_until_next_due() <= 10
+
+    def test_enqueue_cuts_wait_short(self, db, mock_guardian, temp_dir):
+        """Test that a running loop sweeps again soon after a file is queued."""
+        svc = _make_service(db, mock_guardian, poll_seconds=3600)
+        sweeps = []
+        svc._sweep_once = lambda: sweeps.append(time.monotonic())
+        target = temp_dir / "new.txt"
+        target.write_text("x")
+        try:
+            svc.start()
+            deadline = time.monotonic() + 5
+            while not sweeps and time.monotonic() < deadline:
+                time.sleep(0.01)
+            svc.schedule_new_file(str(target), 1)
+            while len(sweeps) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            svc.stop()
+
+        assert len(sweeps) >= 2
+
+
+class TestSweep:
+    """Test processing due items."""
+
+    def test_due_file_is_moved(self, service, db, temp_dir):
+        """Test that a due regular file is classified, moved and marked done."""
+        target = temp_dir / "old.txt"
+        target.write_text("x")
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1))
+
+        service._sweep_once()
+
+        service.classifier.classify.assert_called_once_with(str(target))
+        assert _statuses(db) == {str(target): 'done'}
+
+    def test_missing_file_is_skipped(self, service, db, temp_dir):
+        """Test that files deleted since they were queued are skipped."""
+        db.enqueue_deferred(str(temp_dir / "gone.txt"), datetime.now() - timedelta(seconds=1))
+
+        service._sweep_once()
+
+        service.classifier.classify.assert_not_called()
+        assert _statuses(db) == {str(temp_dir / "gone.txt"): 'skipped'}
+
+    def test_directory_is_skipped(self, service, db, temp_dir):
+        """Test that a path that is now a directory is not moved."""
+        (temp_dir / "folder").mkdir()
+        db.enqueue_deferred(str(temp_dir / "folder"), datetime.now() - timedelta(seconds=1))
+
+        service._sweep_once()
+
+        assert _statuses(db) == {str(temp_dir / "folder"): 'skipped'}
+
+    def test_schedule_existing_skips_directory(self, service, temp_dir):
+        """Test that only regular files are queued by the first-run scan."""
+        (temp_dir / "folder").mkdir()
+        assert service.schedule_existing_file(str(temp_dir / "folder"), 7, 24) == -1
+
+
+class TestGuardianRecheck:
+    """Test the SafetyGuardian check on due items."""
+
+    @pytest.fixture
+    def target(self, temp_dir):
+        target = temp_dir / "old.txt"
+        target.write_text("x")
+        return target
+
+    def test_unchanged_token_runs_quick_check_only(self, service, db, mock_guardian, target):
+        """Test that an unchanged context skips the folder-scanning layers."""
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1), guardian_token='token')
+
+        service._sweep_once()
+
+        mock_guardian.quick_check.assert_called_once_with(str(target))
+        mock_guardian.is_file_safe_to_modify.assert_not_called()
+        assert _statuses(db) == {str(target): 'done'}
+
+    def test_changed_token_runs_full_check(self, service, db, mock_guardian, target):
+        """Test that a changed context runs every guardian layer again."""
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1), guardian_token='stale')
+
+        service._sweep_once()
+
+        mock_guardian.is_file_safe_to_modify.assert_called_once_with(str(target))
+        mock_guardian.quick_check.assert_not_called()
+        assert _statuses(db) == {str(target): 'done'}
+
+    def test_missing_token_runs_full_check(self, service, db, mock_guardian, target):
+        """Test that items queued without a token always get the full check."""
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1))
+
+        service._sweep_once()
+
+        mock_guardian.is_file_safe_to_modify.assert_called_once_with(str(target))
+
+    def test_quick_check_can_reject(self, service, db, mock_guardian, target):
+        """Test that the path and file type layers still run on a token match."""
+        mock_guardian.quick_check.return_value = (False, 'Protected file type')
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1), guardian_token='token')
+
+        service._sweep_once()
+
+        service.classifier.classify.assert_not_called()
+        assert _statuses(db) == {str(target): 'skipped'}
+
+    def test_protected_file_is_skipped(self, service, db, mock_guardian, target):
+        """Test that a file the guardian now rejects is skipped, not moved."""
+        mock_guardian.is_file_safe_to_modify.return_value = (False, 'In application folder')
+        db.enqueue_deferred(str(target), datetime.now() - timedelta(seconds=1), guardian_token='stale')
+
+        service._sweep_once()
+
+        service.classifier.classify.assert_not_called()
+        assert _statuses(db) == {str(target): 'skipped'}
+
+    def test_schedule_stores_token(self, service, db, mock_guardian, target):
+        """Test that the fingerprint of the approved file is stored with the item."""
+        service.schedule_new_file(str(target), 0)
+
+        assert [row['guardian_token'] for row in db.fetch_due_deferred()] == ['token']
+
+
+class TestContextFingerprint:
+    """Test SafetyGuardian.context_fingerprint."""
+
+    @pytest.fixture
+    def protections(self, temp_dir, monkeypatch):
+        protections = temp_dir / "config" / "protected_paths.json"
+        monkeypatch.setattr(SafetyGuardian, '_protections_file', staticmethod(lambda: protections))
+        return protections
+
+    @pytest.fixture
+    def guardian(self, protections):
+        return SafetyGuardian(Mock())
+
+    @pytest.fixture
+    def target(self, temp_dir):
+        target = temp_dir / "a" / "b" / "file.txt"
+        target.parent.mkdir(parents=True)
+        target.write_text("x")
+        return target
+
+    def test_stable_while_nothing_changes(self, guardian, target):
+        assert guardian.context_fingerprint(target) == guardian.context_fingerprint(str(target))
+
+    def test_file_change(self, guardian, target):
+        before = guardian.context_fingerprint(target)
+        target.write_text("changed")
+
+        assert guardian.context_fingerprint(target) != before
+
+    def test_ancestor_change(self, guardian, target, temp_dir):
+        """Test that a change in an ancestor folder (e.g. a new .exe) changes the token."""
+        before = guardian.context_fingerprint(target)
+        (temp_dir / "a" / "setup.exe").write_bytes(b"\x00")
+        os.utime(temp_dir / "a", ns=(0, 10**9))
+
+        assert guardian.context_fingerprint(target) != before
+
+    def test_protections_change(self, guardian, target, protections, temp_dir):
+        """Test that editing the custom protections changes the token."""
+        before = guardian.context_fingerprint(target)
+        protections.write_text('{"protected_paths": ["%s"]}' % temp_dir.as_posix())
+
+        assert guardian.context_fingerprint(target) != before
+
+    def test_missing_file(self, guardian, temp_dir):
+        assert guardian.context_fingerprint(temp_dir / "gone.txt") is None
+
+
+class TestLifecycle:
+    """Test starting and stopping the service."""
+
+    def test_stop_flushes_action_logs(self, service):
+        """Test that buffered action log rows are written when the service stops."""
+        service.stop()
+
+        service.actions.flush_logs.assert_called_once()
+
+    def test_start_requeues_interrupted_claims(self, db, mock_guardian):
+        """Test that items left 'processing' by a killed sweep are queued again on start."""
+        db.enqueue_deferred('/tmp/old.txt', datetime.now() - timedelta(seconds=1))
+        db.fetch_due_deferred()
+        svc = _make_service(db, mock_guardian, poll_seconds=3600)
+        svc._sweep_once = Mock()
+        try:
+            svc.start()
+        finally:
+            svc.stop()
+
+        assert _statuses(db) == {'/tmp/old.txt': 'queued'}